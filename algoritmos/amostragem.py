@@ -0,0 +1,213 @@
+import zlib
+
+import pandas as pd
+import numpy as np
+
+from algoritmos.tabulacao import tabulacao_cruzada
+
+# -------------------------------------------------------------------
+# AMOSTRAGEM ESTRATIFICADA PARA EXECUÇÕES EXPLORATÓRIAS
+# -------------------------------------------------------------------
+#
+# A amostra guarda, em cada linha, o peso amostral (N_h / n_h), o
+# identificador do estrato e o tamanho da amostra no estrato (n_h). Com
+# isso as funções de contagem expandem os resultados para a população e
+# calculam o erro padrão do total estimado (amostragem estratificada
+# simples sem reposição), mesmo depois de filtros por UF, ano etc.
+
+ESTRATOS_PADRAO = ["sg_uf_not", "nu_ano", "classi_fin"]
+
+COLUNAS_AMOSTRA = ["peso_amostral", "estrato_id", "estrato_n"]
+
+# Quadros já agregados (uma linha por combinação de valores) trazem o
+# número de linhas originais nesta coluna; as contagens somam a frequência.
+COLUNA_FREQUENCIA = "frequencia"
+
+Z_95 = 1.959963984540054
+
+
+def amostra_estratificada(
+    quadro: pd.DataFrame,
+    fracao: float,
+    semente: int = 42,
+    estratos: list[str] = ESTRATOS_PADRAO,
+    rotulo: str = "",
+) -> pd.DataFrame:
+    """
+    Sorteia uma amostra estratificada reproduzível: em cada estrato
+    (UF x ano x CLASSI_FIN por padrão) ficam ceil(fracao * N_h) linhas,
+    no mínimo uma.
+
+    'rotulo' (ex.: nome do arquivo) entra na semente e no identificador
+    do estrato, para que amostras de arquivos diferentes possam ser
+    concatenadas sem misturar estratos.
+    """
+    if not 0 < fracao <= 1:
+        raise ValueError(f"Fração de amostragem deve estar em (0, 1]: {fracao}")
+    if quadro.empty:
+        # mantém as colunas de amostra para o concat com outros arquivos
+        return quadro.assign(
+            peso_amostral=pd.Series(dtype="float64"),
+            estrato_id=pd.Series(dtype="int64"),
+            estrato_n=pd.Series(dtype="int64"),
+        )
+
+    colunas = [c for c in estratos if c in quadro.columns]
+    codigo = quadro.groupby(colunas, dropna=False, sort=False).ngroup().to_numpy()
+
+    id_rotulo = zlib.crc32(rotulo.encode())
+    rng = np.random.default_rng([semente, id_rotulo])
+    sorteio = rng.random(len(quadro))
+
+    # ordem aleatória dentro de cada estrato; as primeiras n_h posições entram
+    ordem = np.lexsort([sorteio, codigo])
+    tamanho_pop = np.bincount(codigo)
+    tamanho_amostra = np.maximum(np.ceil(fracao * tamanho_pop), 1).astype(np.int64)
+
+    codigo_ordenado = codigo[ordem]
+    inicio_estrato = np.r_[0, np.cumsum(tamanho_pop)[:-1]]
+    posicao = np.arange(len(quadro)) - inicio_estrato[codigo_ordenado]
+    escolhidas = np.sort(ordem[posicao < tamanho_amostra[codigo_ordenado]])
+
+    amostra = quadro.iloc[escolhidas].copy()
+    cod = codigo[escolhidas]
+    amostra["peso_amostral"] = tamanho_pop[cod] / tamanho_amostra[cod]
+    amostra["estrato_id"] = (np.int64(id_rotulo) << 31) + cod
+    amostra["estrato_n"] = tamanho_amostra[cod]
+
+    print(f"Amostra estratificada ({fracao:.1%}): {len(quadro)} -> {len(amostra)} linhas "
+          f"em {len(tamanho_pop)} estratos.")
+    return amostra
+
+
+def eh_amostra(quadro: pd.DataFrame) -> bool:
+    """
+    Indica se o quadro veio de amostra_estratificada (tem os pesos amostrais).
+    """
+    return all(c in quadro.columns for c in COLUNAS_AMOSTRA)
+
+
+def estimar_contagens(
+    quadro: pd.DataFrame,
+    chaves: list[str],
+    nome: str = "casos",
+) -> pd.DataFrame:
+    """
+    Contagem de linhas por 'chaves'.
+
+    Em dados completos é o mesmo que groupby(chaves).size(); em quadros
+    agregados, a soma da coluna de frequência (mesmo resultado). Em uma
+    amostra estratificada devolve o total estimado (soma dos pesos) e,
+    em colunas extras, o erro padrão e o intervalo de 95%:
+        Var = soma_h N_h^2 (1 - n_h/N_h) p_h (1 - p_h) / (n_h - 1)
+    onde p_h é a fração da amostra do estrato h que cai na célula.
+    """
+    if not eh_amostra(quadro):
+        if COLUNA_FREQUENCIA in quadro.columns:
+            return (
+                quadro.groupby(chaves, as_index=False)[COLUNA_FREQUENCIA]
+                      .sum()
+                      .rename(columns={COLUNA_FREQUENCIA: nome})
+            )
+        return (
+            quadro.groupby(chaves, as_index=False)
+                  .size()
+                  .rename(columns={"size": nome})
+        )
+
+    por_estrato = quadro.groupby(chaves + ["estrato_id"], as_index=False).agg(
+        n_celula=("peso_amostral", "size"),
+        peso=("peso_amostral", "first"),
+        n_estrato=("estrato_n", "first"),
+    )
+
+    por_estrato["estimado"] = por_estrato["peso"] * por_estrato["n_celula"]
+    por_estrato["variancia"] = _variancia_estrato(
+        por_estrato["n_celula"].to_numpy(),
+        por_estrato["peso"].to_numpy(),
+        por_estrato["n_estrato"].to_numpy(),
+    )
+
+    resultado = por_estrato.groupby(chaves, as_index=False).agg(
+        **{nome: ("estimado", "sum"), "variancia": ("variancia", "sum")}
+    )
+    erro = np.sqrt(resultado.pop("variancia"))
+    resultado["erro_padrao"] = erro
+    resultado["ic95_inf"] = np.maximum(resultado[nome] - Z_95 * erro, 0.0)
+    resultado["ic95_sup"] = resultado[nome] + Z_95 * erro
+    return resultado
+
+
+def _variancia_estrato(n_celula: np.ndarray, peso: np.ndarray, n_estrato: np.ndarray) -> np.ndarray:
+    """
+    Contribuição de cada (célula, estrato) para a variância do total estimado:
+        N_h^2 (1 - n_h/N_h) p_h (1 - p_h) / (n_h - 1),  p_h = n_celula / n_h
+    """
+    n_h = np.asarray(n_estrato, dtype=float)
+    pop_h = np.asarray(peso, dtype=float) * n_h
+    p = np.asarray(n_celula, dtype=float) / n_h
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(
+            n_h > 1,
+            # correção de população finita; estrato inteiro na amostra -> 0
+            pop_h ** 2 * np.maximum(1 - n_h / pop_h, 0.0) * p * (1 - p) / (n_h - 1),
+            0.0,
+        )
+
+
+def erro_padrao_tabulacao(
+    colunas: dict[str, pd.Series],
+    quadro: pd.DataFrame,
+    condicao: pd.Series | np.ndarray | None = None,
+) -> tuple[list[pd.Index], np.ndarray, np.ndarray | None]:
+    """
+    Erro padrão dos totais estimados de tabulacao_cruzada(colunas, condicao,
+    pesos=peso_amostral) sobre uma amostra estratificada.
+
+    O estrato entra como último eixo da tabulação (contando linhas da
+    amostra); a variância de cada célula é a soma das contribuições dos
+    estratos, como em estimar_contagens.
+
+    Retorna os eixos (os mesmos da tabulação sem o estrato), o erro padrão
+    dos totais e o dos totais condicionais (None sem condição).
+    """
+    tab = tabulacao_cruzada({**colunas, "estrato_id": quadro["estrato_id"]}, condicao=condicao)
+
+    info = (
+        quadro.groupby("estrato_id")[["peso_amostral", "estrato_n"]]
+              .first()
+              .reindex(tab.eixos[-1])
+    )
+    peso = info["peso_amostral"].to_numpy()
+    n_estrato = info["estrato_n"].to_numpy()
+
+    def erro(contagem: np.ndarray) -> np.ndarray:
+        return np.sqrt(_variancia_estrato(contagem, peso, n_estrato).sum(axis=-1))
+
+    erro_condicional = None if tab.contagem_condicional is None else erro(tab.contagem_condicional)
+    return tab.eixos[:-1], erro(tab.contagem), erro_condicional
+
+
+def adicionar_intervalos(tabela: pd.DataFrame, nome: str, erro) -> pd.DataFrame:
+    """
+    Acrescenta à tabela o erro padrão e o intervalo de 95% da coluna
+    estimada 'nome', nas colunas 'erro_padrao_<nome>', 'ic95_inf_<nome>' e
+    'ic95_sup_<nome>' (para tabelas com mais de um total estimado).
+    """
+    erro = np.asarray(erro, dtype=float)
+    tabela[f"erro_padrao_{nome}"] = erro
+    tabela[f"ic95_inf_{nome}"] = np.maximum(tabela[nome] - Z_95 * erro, 0.0)
+    tabela[f"ic95_sup_{nome}"] = tabela[nome] + Z_95 * erro
+    return tabela
+
+
+def pesos_contagem(quadro: pd.DataFrame) -> pd.Series | None:
+    """
+    Pesos a somar no lugar de contar linhas: peso amostral numa amostra,
+    frequência num quadro agregado, None em dados completos.
+    """
+    if eh_amostra(quadro):
+        return quadro["peso_amostral"]
+    if COLUNA_FREQUENCIA in quadro.columns:
+        return quadro[COLUNA_FREQUENCIA]
+    return None
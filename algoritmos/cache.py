@@ -0,0 +1,252 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import shutil
+
+import pandas as pd
+import numpy as np
+
+from algoritmos.indice import QuadroIndexado
+
+# -------------------------------------------------------------------
+# CACHE EM DISCO DOS RESULTADOS DAS ANÁLISES
+# -------------------------------------------------------------------
+#
+# Cada resultado é guardado em DIRETORIO_CACHE/<chave>/ como arquivos
+# Parquet (um por DataFrame devolvido). A chave combina:
+#   - módulo, nome e versão da função
+#   - impressão digital de cada quadro recebido: a dos .zip de origem para
+#     o QuadroIndexado de carregar_dados (sem custo por chamada), o hash do
+#     conteúdo para os DataFrames comuns
+#   - demais parâmetros
+# Quando o diretório passa de TAMANHO_MAXIMO_CACHE, as entradas usadas há
+# mais tempo são removidas (LRU pela data de modificação, atualizada a cada
+# acerto).
+
+DIRETORIO_CACHE = ".cache_resultados"
+TAMANHO_MAXIMO_CACHE = 2 * 1024 ** 3  # 2 GB
+
+CACHE_ATIVO = True
+
+# Incrementar quando mudarem as etapas de limpeza (regras de validação,
+# chaves de deduplicação, filtros), para invalidar o que foi derivado dos
+# .zip com as regras antigas
+VERSAO_LIMPEZA = 2
+
+ESTATISTICAS_CACHE = {"acertos": 0, "falhas": 0, "gravacoes": 0, "remocoes": 0}
+
+_ARQUIVO_META = "meta.json"
+
+
+def impressao_digital_zips(caminhos_zip: list[str], *extras) -> str:
+    """
+    Impressão digital barata dos arquivos de origem: caminho, tamanho e data
+    de modificação de cada .zip, a versão das etapas de limpeza
+    (VERSAO_LIMPEZA) e parâmetros extras da leitura/limpeza.
+    """
+    h = hashlib.sha256()
+    for caminho in caminhos_zip:
+        info = os.stat(caminho)
+        h.update(f"{os.path.abspath(caminho)}|{info.st_size}|{info.st_mtime_ns};".encode())
+    h.update(f"limpeza={VERSAO_LIMPEZA};".encode())
+    h.update(repr(extras).encode())
+    return h.hexdigest()
+
+
+def impressao_digital_quadro(quadro: pd.DataFrame) -> str:
+    """
+    Impressão digital do conteúdo de um DataFrame: nomes, tipos e valores de
+    cada coluna, na ordem das linhas.
+
+    É recalculada a cada chamada: uma marca guardada em attrs seria copiada
+    pelo pandas para quadros reordenados ou editados no lugar. Colunas
+    numéricas e de data entram no hash como bytes, sem conversão; as demais
+    passam por pd.util.hash_pandas_object.
+    """
+    h = hashlib.sha256()
+    h.update(f"{len(quadro)};".encode())
+    for nome in quadro.columns:
+        coluna = quadro[nome]
+        h.update(f"{nome}:{coluna.dtype};".encode())
+        valores = coluna.to_numpy()
+        if valores.dtype.kind in "biufcmM":
+            h.update(np.ascontiguousarray(valores).view(np.uint8))
+        else:
+            h.update(pd.util.hash_pandas_object(coluna, index=False).to_numpy())
+    return h.hexdigest()
+
+
+def impressao_digital_indexado(quadro: QuadroIndexado) -> str:
+    """
+    Impressão digital de um QuadroIndexado: a dos dados de origem, marcada
+    por carregar_dados, ou o hash do conteúdo, calculado uma só vez e
+    guardado no objeto.
+
+    Guardar é seguro aqui, ao contrário de attrs: o quadro do QuadroIndexado
+    não muda, e edições feitas em QuadroIndexado.quadro ficam numa cópia
+    que não leva a marca (é um DataFrame comum, com hash do conteúdo).
+    """
+    if quadro.impressao is None:
+        quadro.impressao = impressao_digital_quadro(quadro.quadro)
+    return quadro.impressao
+
+
+def _chave_chamada(funcao, versao: int, args: tuple, kwargs: dict) -> str:
+    """
+    Monta a chave do cache a partir da função, da versão e dos argumentos
+    (com os valores padrão aplicados, para que f(x) e f(x, uf_cod=35) coincidam).
+    """
+    assinatura = inspect.signature(funcao).bind(*args, **kwargs)
+    assinatura.apply_defaults()
+
+    partes = [funcao.__module__, funcao.__qualname__, str(versao)]
+    for nome, valor in assinatura.arguments.items():
+        if isinstance(valor, pd.DataFrame):
+            partes.append(f"{nome}=df:{impressao_digital_quadro(valor)}")
+        elif isinstance(valor, QuadroIndexado):
+            partes.append(f"{nome}=indexado:{impressao_digital_indexado(valor)}")
+        else:
+            partes.append(f"{nome}={valor!r}")
+
+    return hashlib.sha256("|".join(partes).encode()).hexdigest()
+
+
+def _tamanho_diretorio(caminho: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(raiz, arq))
+        for raiz, _, arquivos in os.walk(caminho)
+        for arq in arquivos
+    )
+
+
+def _ler_entrada(pasta: str):
+    with open(os.path.join(pasta, _ARQUIVO_META), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+
+    partes = []
+    for i in range(meta["n_partes"]):
+        parte = pd.read_parquet(os.path.join(pasta, f"parte_{i}.parquet"))
+        # o Parquet devolve texto como 'str'; colunas que eram object voltam a object
+        objetos = meta.get("colunas_objeto", [[]] * meta["n_partes"])[i]
+        if objetos:
+            parte = parte.astype({c: object for c in objetos})
+        partes.append(parte)
+    return tuple(partes) if meta["tipo"] == "tupla" else partes[0]
+
+
+def _gravar_entrada(pasta: str, resultado) -> bool:
+    """
+    Grava o resultado (DataFrame ou tupla de DataFrames) em Parquet.
+    Outros tipos de retorno não são guardados.
+    """
+    partes = resultado if isinstance(resultado, tuple) else (resultado,)
+    if not all(isinstance(p, pd.DataFrame) for p in partes):
+        return False
+
+    temporaria = pasta + ".tmp"
+    os.makedirs(temporaria, exist_ok=True)
+    try:
+        for i, parte in enumerate(partes):
+            parte.to_parquet(os.path.join(temporaria, f"parte_{i}.parquet"))
+        with open(os.path.join(temporaria, _ARQUIVO_META), "w", encoding="utf-8") as f:
+            json.dump({
+                "tipo": "tupla" if isinstance(resultado, tuple) else "quadro",
+                "n_partes": len(partes),
+                "colunas_objeto": [
+                    [c for c in parte.columns if parte[c].dtype == object] for parte in partes
+                ],
+            }, f)
+        os.replace(temporaria, pasta)
+    except Exception as e:
+        shutil.rmtree(temporaria, ignore_errors=True)
+        print(f"Aviso: resultado não guardado no cache ({e}).")
+        return False
+
+    return True
+
+
+def _remover_excesso():
+    """
+    Remove as entradas usadas há mais tempo até o cache caber em TAMANHO_MAXIMO_CACHE.
+    """
+    diretorio = DIRETORIO_CACHE
+    if not os.path.isdir(diretorio):
+        return
+
+    entradas = []
+    for nome in os.listdir(diretorio):
+        pasta = os.path.join(diretorio, nome)
+        if os.path.isdir(pasta) and not nome.endswith(".tmp"):
+            entradas.append((os.path.getmtime(pasta), _tamanho_diretorio(pasta), pasta))
+
+    total = sum(tamanho for _, tamanho, _ in entradas)
+    for _, tamanho, pasta in sorted(entradas):
+        if total <= TAMANHO_MAXIMO_CACHE:
+            break
+        shutil.rmtree(pasta, ignore_errors=True)
+        total -= tamanho
+        ESTATISTICAS_CACHE["remocoes"] += 1
+
+
+def cache_resultado(versao: int = 1):
+    """
+    Decorador que guarda em disco o resultado de uma função de análise.
+
+    'versao' deve ser incrementada sempre que a lógica da função mudar,
+    para que resultados antigos deixem de ser usados.
+    """
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            if not CACHE_ATIVO:
+                return funcao(*args, **kwargs)
+
+            chave = _chave_chamada(funcao, versao, args, kwargs)
+            pasta = os.path.join(DIRETORIO_CACHE, chave)
+
+            if os.path.isdir(pasta):
+                try:
+                    resultado = _ler_entrada(pasta)
+                    os.utime(pasta)  # marca como usada recentemente
+                    ESTATISTICAS_CACHE["acertos"] += 1
+                    return resultado
+                except Exception as e:
+                    print(f"Aviso: entrada de cache ilegível para {funcao.__name__} ({e}).")
+                    shutil.rmtree(pasta, ignore_errors=True)
+
+            ESTATISTICAS_CACHE["falhas"] += 1
+            resultado = funcao(*args, **kwargs)
+
+            os.makedirs(DIRETORIO_CACHE, exist_ok=True)
+            if _gravar_entrada(pasta, resultado):
+                ESTATISTICAS_CACHE["gravacoes"] += 1
+                _remover_excesso()
+
+            return resultado
+
+        return envoltorio
+
+    return decorador
+
+
+def estatisticas_cache() -> dict:
+    """
+    Contadores de acertos, falhas, gravações e remoções desde o início do
+    processo, mais o tamanho atual do cache em disco.
+    """
+    estat = dict(ESTATISTICAS_CACHE)
+    consultas = estat["acertos"] + estat["falhas"]
+    estat["taxa_acerto"] = estat["acertos"] / consultas if consultas else 0.0
+    estat["bytes_em_disco"] = (
+        _tamanho_diretorio(DIRETORIO_CACHE) if os.path.isdir(DIRETORIO_CACHE) else 0
+    )
+    return estat
+
+
+def limpar_cache():
+    """
+    Apaga todas as entradas do cache em disco.
+    """
+    shutil.rmtree(DIRETORIO_CACHE, ignore_errors=True)
@@ -0,0 +1,298 @@
+import os
+import zipfile
+
+import pandas as pd
+
+from algoritmos.limpeza_dados import VALORES_AUSENTES
+from algoritmos.validacao import validar_dados
+from algoritmos.cache import impressao_digital_zips
+from algoritmos.estatisticas import montar_tabela_gravidade
+
+# -------------------------------------------------------------------
+# MOTOR LAZY (DuckDB SOBRE PARQUET)
+# -------------------------------------------------------------------
+#
+# Alternativa opcional ao caminho pandas: os DENGBR são convertidos uma vez
+# para Parquet e cada análise vira uma consulta SQL sobre esses arquivos.
+# O DuckDB só materializa o resultado final: o filtro de UF/ano desce até a
+# leitura (estatísticas min/max de cada row group do Parquet) e só as
+# colunas usadas pela consulta são lidas.
+#
+# As funções devolvem exatamente as mesmas tabelas das versões de
+# algoritmos/estatisticas.py: a agregação pesada é feita no SQL e os
+# ajustes finais (pivot, proporções, nomes de municípios) usam o mesmo
+# código pandas sobre o resultado já pequeno.
+#
+# Requer os pacotes opcionais duckdb e pyarrow.
+
+# Colunas numéricas convertidas como no pd.to_numeric(errors="coerce")
+COLUNAS_NUMERICAS = ["sem_not", "nu_ano", "sg_uf_not", "nu_idade_n", "classi_fin", "id_mn_resi"]
+COLUNAS_DATA = ["dt_notific", "dt_sin_pri"]
+
+# Metadado do Parquet com a impressão digital do .zip e da limpeza de origem
+_CHAVE_IMPRESSAO = b"impressao_digital"
+
+
+def preparar_parquet(
+    caminhos_zip: list[str],
+    colunas: list[str],
+    diretorio: str = "dados_parquet",
+    linhas_por_lote: int = 1_000_000,
+    validar: bool = True,
+) -> str:
+    """
+    Converte cada .zip DENGBR em um arquivo Parquet (só as colunas pedidas,
+    nomes em minúsculas), lendo o CSV em fluxo e em lotes, sem carregar o
+    arquivo inteiro na memória. Colunas numéricas viram DOUBLE (valores
+    inválidos -> nulo), datas viram TIMESTAMP e as demais ficam como texto.
+
+    Com 'validar', cada lote passa por validar_dados (mesmas regras de
+    carregar_dados, sem arquivo de quarentena), para que as consultas vejam
+    as mesmas linhas do caminho pandas. A deduplicação entre arquivos não é
+    aplicada (como em carregar_dados por padrão).
+
+    Um Parquet existente é reaproveitado se foi gerado do mesmo .zip
+    (caminho, tamanho e data de modificação), com as mesmas colunas, a mesma
+    opção de validação e a mesma VERSAO_LIMPEZA: essa impressão digital fica
+    nos metadados do arquivo.
+
+    Retorna o diretório com os arquivos .parquet.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+
+    os.makedirs(diretorio, exist_ok=True)
+    nomes = [c.lower() for c in colunas]
+    esquema = pa.schema([
+        (c, pa.float64() if c in COLUNAS_NUMERICAS
+         else pa.timestamp("us") if c in COLUNAS_DATA
+         else pa.string())
+        for c in nomes
+    ])
+
+    for caminho in caminhos_zip:
+        destino = os.path.join(diretorio, os.path.splitext(os.path.basename(caminho))[0] + ".parquet")
+        impressao = impressao_digital_zips([caminho], nomes, validar).encode()
+
+        if os.path.exists(destino):
+            metadados = pq.read_schema(destino).metadata or {}
+            if metadados.get(_CHAVE_IMPRESSAO) == impressao:
+                print(f"Parquet atualizado, conversão ignorada: {destino}")
+                continue
+
+        with zipfile.ZipFile(caminho, "r") as z:
+            csvs = [arq for arq in z.namelist() if arq.lower().endswith(".csv")]
+            if not csvs:
+                print(f"Nenhum arquivo .csv encontrado dentro de {caminho}")
+                continue
+
+            temporario = destino + ".tmp"
+            with z.open(csvs[0]) as f:
+                leitor = pacsv.open_csv(
+                    f,
+                    read_options=pacsv.ReadOptions(block_size=64 << 20),
+                    convert_options=pacsv.ConvertOptions(
+                        include_columns=colunas,
+                        column_types={c: pa.string() for c in colunas},
+                        null_values=VALORES_AUSENTES,
+                        strings_can_be_null=True,
+                    ),
+                )
+                with pq.ParquetWriter(temporario, esquema.with_metadata({_CHAVE_IMPRESSAO: impressao})) as escritor:
+                    for lote in leitor:
+                        quadro = lote.to_pandas()
+                        quadro.columns = [c.lower() for c in quadro.columns]
+                        if validar:
+                            quadro, _ = validar_dados(quadro, caminho_quarentena=None)
+                        for c in COLUNAS_NUMERICAS:
+                            if c in quadro.columns:
+                                quadro[c] = pd.to_numeric(quadro[c], errors="coerce").astype("float64")
+                        for c in COLUNAS_DATA:
+                            if c in quadro.columns:
+                                quadro[c] = pd.to_datetime(quadro[c], errors="coerce").astype("datetime64[us]")
+                        tabela = pa.Table.from_pandas(quadro[nomes], schema=esquema, preserve_index=False)
+                        escritor.write_table(tabela, row_group_size=linhas_por_lote)
+            os.replace(temporario, destino)
+
+        print(f"Parquet gerado: {destino}")
+
+    return diretorio
+
+
+def abrir_consulta(diretorio_parquet: str = "dados_parquet"):
+    """
+    Abre uma conexão DuckDB com a visão 'casos' sobre todos os Parquet do
+    diretório, já sem os casos descartados (equivalente a filtrar_classificados).
+    Nada é lido até uma consulta ser executada.
+    """
+    import duckdb
+
+    conexao = duckdb.connect()
+    padrao = os.path.join(diretorio_parquet, "*.parquet").replace("'", "''")
+    conexao.execute(f"""
+        CREATE VIEW casos AS
+        SELECT * FROM read_parquet('{padrao}')
+        WHERE classi_fin IS NULL OR classi_fin <> 5
+    """)
+    return conexao
+
+
+def _consultar(conexao, sql: str, parametros: list | None = None) -> pd.DataFrame:
+    return conexao.execute(sql, parametros or []).df()
+
+
+# Mesma regra de faixa_etaria (idade truncada para inteiro, <= 0 ou ausente = Desconhecida)
+_SQL_FAIXA_ETARIA = """
+    CASE
+        WHEN nu_idade_n IS NULL OR trunc(nu_idade_n) <= 0 THEN 'Desconhecida'
+        WHEN trunc(nu_idade_n) <= 14 THEN '0-14'
+        WHEN trunc(nu_idade_n) <= 29 THEN '15-29'
+        WHEN trunc(nu_idade_n) <= 59 THEN '30-59'
+        ELSE '60+'
+    END
+"""
+
+
+def contagem_semanal_uf_lazy(conexao, uf_cod: int = 35) -> pd.DataFrame:
+    """
+    Versão lazy de contagem_semanal_uf.
+    Saída: colunas ['nu_ano', 'semana_ep', 'casos']
+    """
+    return _consultar(conexao, """
+        SELECT CAST(nu_ano AS BIGINT) AS nu_ano,
+               CAST(sem_not % 100 AS BIGINT) AS semana_ep,
+               COUNT(*) AS casos
+        FROM casos
+        WHERE sg_uf_not = ? AND sem_not IS NOT NULL AND nu_ano IS NOT NULL
+        GROUP BY 1, 2
+        ORDER BY 1, 2
+    """, [uf_cod])
+
+
+def contagem_anual_uf_lazy(conexao, uf_cod: int = 35) -> pd.DataFrame:
+    """
+    Versão lazy de contagem_anual_uf.
+    Saída: colunas ['nu_ano', 'casos']
+    """
+    return _consultar(conexao, """
+        SELECT CAST(nu_ano AS BIGINT) AS nu_ano, COUNT(*) AS casos
+        FROM casos
+        WHERE sg_uf_not = ? AND nu_ano IS NOT NULL
+        GROUP BY 1
+        ORDER BY 1
+    """, [uf_cod])
+
+
+def tabela_gravidade_por_ano_uf_lazy(conexao, uf_cod: int = 35) -> pd.DataFrame:
+    """
+    Versão lazy de tabela_gravidade_por_ano_uf: a contagem por ano x
+    CLASSI_FIN sai do SQL e a tabela final é montada por
+    montar_tabela_gravidade, como na versão pandas.
+    """
+    contagem = _consultar(conexao, """
+        SELECT CAST(nu_ano AS BIGINT) AS nu_ano, classi_fin, COUNT(*) AS casos
+        FROM casos
+        WHERE sg_uf_not = ? AND nu_ano IS NOT NULL AND classi_fin IS NOT NULL
+        GROUP BY 1, 2
+    """, [uf_cod])
+
+    tabela = contagem.pivot_table(
+        index="nu_ano", columns="classi_fin", values="casos", aggfunc="sum", fill_value=0
+    )
+    return montar_tabela_gravidade(tabela.index, tabela.columns, tabela.to_numpy())
+
+
+def _perfil_lazy(conexao, uf_cod: int, por_ano: bool) -> pd.DataFrame:
+    ano = "CAST(nu_ano AS BIGINT) AS nu_ano, " if por_ano else ""
+    filtro_ano = "AND nu_ano IS NOT NULL" if por_ano else ""
+    n_chaves = 3 if por_ano else 2
+
+    perfil = _consultar(conexao, f"""
+        SELECT {ano}{_SQL_FAIXA_ETARIA} AS faixa_etaria,
+               cs_sexo,
+               COUNT(*) AS total,
+               SUM(CASE WHEN classi_fin = 12 THEN 1 ELSE 0 END) AS total_graves
+        FROM casos
+        WHERE sg_uf_not = ? AND cs_sexo IS NOT NULL {filtro_ano}
+        GROUP BY {", ".join(str(i) for i in range(1, n_chaves + 1))}
+        ORDER BY {", ".join(str(i) for i in range(1, n_chaves + 1))}
+    """, [uf_cod])
+
+    perfil["cs_sexo"] = perfil["cs_sexo"].astype(str)
+    perfil["total_graves"] = perfil["total_graves"].astype("int64")
+    perfil["total_graves"] = perfil["total_graves"].where(perfil["total_graves"] > 0)
+    perfil["proporcao_graves"] = perfil["total_graves"] / perfil["total"]
+    return perfil
+
+
+def perfil_demografico_lazy(conexao, uf_cod: int = 35) -> pd.DataFrame:
+    """
+    Versão lazy de perfil_demografico.
+    """
+    return _perfil_lazy(conexao, uf_cod, por_ano=False)
+
+
+def perfil_por_ano_lazy(conexao, uf_cod: int = 35) -> pd.DataFrame:
+    """
+    Versão lazy de perfil_por_ano.
+    """
+    return _perfil_lazy(conexao, uf_cod, por_ano=True)
+
+
+def _contagem_municipios_lazy(conexao, uf_cod: int) -> pd.DataFrame:
+    return _consultar(conexao, """
+        SELECT lpad(CAST(CAST(id_mn_resi AS BIGINT) AS VARCHAR), 6, '0') AS id_mn_resi_6,
+               COUNT(*) AS total_casos,
+               CAST(SUM(CASE WHEN classi_fin = 12 THEN 1 ELSE 0 END) AS BIGINT) AS total_graves
+        FROM casos
+        WHERE sg_uf_not = ? AND id_mn_resi IS NOT NULL
+        GROUP BY 1
+        ORDER BY 1
+    """, [uf_cod])
+
+
+def casos_por_municipio_sp_lazy(
+    conexao,
+    mapa_mun_sp: pd.DataFrame,
+    uf_cod: int = 35,
+    top_n: int = 20,
+) -> pd.DataFrame:
+    """
+    Versão lazy de casos_por_municipio_sp.
+    """
+    contagem = _contagem_municipios_lazy(conexao, uf_cod)[["id_mn_resi_6", "total_casos"]]
+    contagem = contagem.rename(columns={"total_casos": "casos"})
+
+    tabela = contagem.merge(mapa_mun_sp, on="id_mn_resi_6", how="left")
+    tabela["municipio_nome"] = tabela["municipio_nome"].fillna(tabela["id_mn_resi_6"])
+    tabela = (
+        tabela.sort_values("casos", ascending=False)
+        .head(top_n)
+        .reset_index(drop=True)
+    )
+    return tabela[["id_mn_resi_6", "municipio_nome", "casos"]]
+
+
+def casos_graves_por_municipio_sp_lazy(
+    conexao,
+    mapa_mun_sp: pd.DataFrame,
+    uf_cod: int = 35,
+    top_n: int = 20,
+) -> pd.DataFrame:
+    """
+    Versão lazy de casos_graves_por_municipio_sp.
+    """
+    tabela = _contagem_municipios_lazy(conexao, uf_cod)
+    tabela["proporcao_graves"] = tabela["total_graves"] / tabela["total_casos"]
+
+    tabela = tabela.merge(mapa_mun_sp, on="id_mn_resi_6", how="left")
+    tabela["municipio_nome"] = tabela["municipio_nome"].fillna(tabela["id_mn_resi_6"])
+    tabela = (
+        tabela.sort_values("total_graves", ascending=False)
+        .head(top_n)
+        .reset_index(drop=True)
+    )
+    return tabela[
+        ["id_mn_resi_6", "municipio_nome", "total_casos", "total_graves", "proporcao_graves"]
+    ]
@@ -0,0 +1,305 @@
+import os
+
+import pandas as pd
+import numpy as np
+
+from algoritmos.limpeza_dados import leitor_csv_zip
+from algoritmos.amostragem import amostra_estratificada
+
+# Chaves padrão que identificam uma mesma notificação entre arquivos DENGBR
+CHAVES_PADRAO = ["id_mn_resi", "dt_sin_pri", "nu_idade_n", "cs_sexo", "dt_notific"]
+
+COLUNAS_DATA = ("dt_sin_pri", "dt_notific")
+
+# Valor usado no lugar de datas ausentes (NaT) depois da conversão para dias
+_SEM_DATA = np.iinfo(np.int64).min
+
+
+def _chaves_em_arrays(quadro: pd.DataFrame, chaves: list[str]) -> tuple[np.ndarray, list[np.ndarray]]:
+    """
+    Transforma as chaves de cada linha em arrays numéricos:
+    - bloco: hash (uint64) das chaves que não são datas
+    - dias: uma lista de arrays int64 (dias desde 1970) para cada chave de data
+
+    Colunas numéricas são normalizadas para float64 e as demais para texto,
+    para que o mesmo caso gere o mesmo hash mesmo que o pandas tenha inferido
+    tipos diferentes em arquivos diferentes.
+    """
+    chaves_bloco = [c for c in chaves if c not in COLUNAS_DATA]
+    chaves_data = [c for c in chaves if c in COLUNAS_DATA]
+
+    normalizado = pd.DataFrame(index=quadro.index)
+    for c in chaves_bloco:
+        if pd.api.types.is_numeric_dtype(quadro[c]):
+            normalizado[c] = quadro[c].astype("float64")
+        else:
+            normalizado[c] = quadro[c].astype(str)
+
+    if chaves_bloco:
+        bloco = pd.util.hash_pandas_object(normalizado, index=False).to_numpy()
+    else:
+        bloco = np.zeros(len(quadro), dtype=np.uint64)
+
+    dias = []
+    for c in chaves_data:
+        datas = pd.to_datetime(quadro[c], errors="coerce")
+        valores = datas.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]").astype(np.int64)
+        valores[datas.isna().to_numpy()] = _SEM_DATA
+        dias.append(valores)
+
+    return bloco, dias
+
+
+def _dias_relativos(dias: list[np.ndarray], tolerancia_dias: int) -> tuple[list[np.ndarray], int]:
+    """
+    Converte cada chave de data para inteiros pequenos e não negativos
+    (dias desde a menor data + tolerância + 1), com as datas ausentes em 0:
+    duas ausentes são iguais e uma ausente fica sempre a mais de
+    'tolerancia_dias' de qualquer data presente.
+
+    Retorna também a largura da faixa de valores, usada para montar chaves
+    lineares sem que uma janela de ±tolerância cruze para outro grupo.
+    """
+    presentes = [d[d != _SEM_DATA] for d in dias]
+    presentes = np.concatenate(presentes) if presentes else np.empty(0, dtype=np.int64)
+    menor = presentes.min() if len(presentes) else 0
+    maior = presentes.max() if len(presentes) else 0
+    largura = int(maior - menor) + 2 * tolerancia_dias + 2
+
+    relativos = [np.where(d == _SEM_DATA, 0, d - menor + tolerancia_dias + 1) for d in dias]
+    return relativos, largura
+
+
+def _marcar_contra_aceitas(
+    bloco_ref: np.ndarray,
+    dias_ref: list[np.ndarray],
+    bloco: np.ndarray,
+    dias: list[np.ndarray],
+    tolerancia_dias: int,
+) -> np.ndarray:
+    """
+    Núcleo vetorizado da deduplicação.
+
+    Marca as linhas novas (bloco, dias) que repetem alguma linha já aceita
+    (bloco_ref, dias_ref): mesmo bloco e as duas datas a no máximo
+    'tolerancia_dias' de distância (0 = modo exato).
+
+    As aceitas são indexadas por (bloco, primeira data) e, dentro disso,
+    ordenadas pela segunda data. Para cada deslocamento k da primeira data
+    dentro da tolerância, uma busca binária encontra o grupo
+    (bloco, data + k) e outra verifica se há no grupo uma segunda data dentro
+    da janela. Cada linha nova é comparada com todas as aceitas da janela
+    (não só com a vizinha numa ordenação), sem gerar os pares, e linhas
+    novas nunca servem de referência umas para as outras, então não há
+    encadeamento A~B~C.
+    """
+    n = len(bloco)
+    duplicada = np.zeros(n, dtype=bool)
+    if n == 0 or len(bloco_ref) == 0:
+        return duplicada
+
+    n_ref = len(bloco_ref)
+
+    # até duas chaves de data; as que faltam viram uma constante
+    juntos = [np.concatenate([r, d]) for r, d in zip(dias_ref, dias)]
+    juntos += [np.zeros(n_ref + n, dtype=np.int64)] * (2 - len(juntos))
+    (primeira, segunda), largura = _dias_relativos(juntos, tolerancia_dias)
+
+    # posição de cada bloco entre os blocos distintos das duas partes
+    _, posto = np.unique(np.concatenate([bloco_ref, bloco]), return_inverse=True)
+    grupo = posto.astype(np.int64).ravel() * largura + primeira
+
+    # aceitas: grupo (bloco, primeira data) -> posto do grupo * largura + segunda data
+    grupos_ref = np.unique(grupo[:n_ref])
+    chave_ref = np.sort(np.searchsorted(grupos_ref, grupo[:n_ref]) * largura + segunda[:n_ref])
+
+    grupo_novo, segunda_nova = grupo[n_ref:], segunda[n_ref:]
+    for k in range(-tolerancia_dias, tolerancia_dias + 1):
+        alvo = grupo_novo + k
+        pos = np.searchsorted(grupos_ref, alvo)
+        achou = pos < len(grupos_ref)
+        achou[achou] = grupos_ref[pos[achou]] == alvo[achou]
+
+        base = pos * largura + segunda_nova
+        inicio = np.searchsorted(chave_ref, base - tolerancia_dias, side="left")
+        fim = np.searchsorted(chave_ref, base + tolerancia_dias, side="right")
+        duplicada |= achou & (fim > inicio)
+
+    return duplicada
+
+
+def _relatorio_remocoes(removidas: pd.DataFrame) -> pd.DataFrame:
+    """
+    Conta as duplicatas removidas por ano e UF de notificação.
+    Saída: colunas ['nu_ano', 'sg_uf_not', 'duplicatas_removidas']
+    """
+    colunas = [c for c in ("nu_ano", "sg_uf_not") if c in removidas.columns]
+    if not colunas or removidas.empty:
+        return pd.DataFrame(columns=colunas + ["duplicatas_removidas"])
+
+    return (
+        removidas.groupby(colunas, as_index=False)
+                 .size()
+                 .rename(columns={"size": "duplicatas_removidas"})
+    )
+
+
+def marcar_duplicatas(
+    quadro: pd.DataFrame,
+    origem: str | pd.Series | np.ndarray,
+    chaves: list[str] = CHAVES_PADRAO,
+    modo: str = "exato",
+    tolerancia_dias: int = 3,
+    n_particoes: int = 1,
+) -> pd.Series:
+    """
+    Retorna uma Series booleana (mesmo índice do quadro) indicando as linhas
+    que repetem uma notificação de um arquivo anterior.
+
+    origem: nome da coluna (ou array/Series) com o arquivo de origem de cada
+    linha. Só linhas de arquivos diferentes são comparadas: dentro de um
+    mesmo arquivo, chaves iguais são pacientes diferentes (as chaves padrão
+    não identificam uma pessoa). Os arquivos são processados na ordem em que
+    aparecem no quadro e cada um é comparado com as linhas aceitas dos
+    anteriores, mantendo a primeira ocorrência.
+
+    modo:
+        "exato"      -> todas as chaves precisam ser iguais
+        "aproximado" -> chaves que não são datas iguais e datas (DT_SIN_PRI,
+                        DT_NOTIFIC) a no máximo 'tolerancia_dias' de distância
+
+    n_particoes > 1 processa o quadro em partições pelo hash das chaves que
+    não são datas; linhas que podem ser duplicatas sempre caem na mesma
+    partição, então o resultado é o mesmo com menos memória de trabalho.
+    """
+    if modo not in ("exato", "aproximado"):
+        raise ValueError(f"Modo de deduplicação desconhecido: '{modo}'")
+
+    faltando = [c for c in chaves if c not in quadro.columns]
+    if faltando:
+        raise KeyError(f"Colunas de chave não encontradas no DataFrame: {faltando}")
+
+    tolerancia = tolerancia_dias if modo == "aproximado" else 0
+
+    rotulos = quadro[origem] if isinstance(origem, str) else pd.Series(np.asarray(origem))
+    arquivo, _ = pd.factorize(rotulos, use_na_sentinel=False)
+
+    bloco, dias = _chaves_em_arrays(quadro, chaves)
+
+    duplicada = np.zeros(len(quadro), dtype=bool)
+    particao = bloco % np.uint64(max(n_particoes, 1))
+    for p in range(max(n_particoes, 1)):
+        aceitas = np.empty(0, dtype=np.int64)
+        for a in range(arquivo.max() + 1 if len(arquivo) else 0):
+            sel = np.flatnonzero((arquivo == a) & (particao == p))
+            dup = _marcar_contra_aceitas(
+                bloco[aceitas], [d[aceitas] for d in dias],
+                bloco[sel], [d[sel] for d in dias],
+                tolerancia,
+            )
+            duplicada[sel] = dup
+            aceitas = np.concatenate([aceitas, sel[~dup]])
+
+    return pd.Series(duplicada, index=quadro.index, name="duplicada")
+
+
+def deduplicar_notificacoes(
+    quadro: pd.DataFrame,
+    origem: str | pd.Series | np.ndarray,
+    chaves: list[str] = CHAVES_PADRAO,
+    modo: str = "exato",
+    tolerancia_dias: int = 3,
+    n_particoes: int = 1,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Remove notificações repetidas entre arquivos (mesmo caso notificado de
+    novo ou presente em arquivos de anos diferentes), mantendo a primeira
+    ocorrência. 'origem' identifica o arquivo de cada linha (ver
+    marcar_duplicatas).
+
+    Retorna:
+    - quadro sem duplicatas
+    - relatório com o número de duplicatas removidas por ano e UF
+    """
+    if quadro.empty:
+        return quadro, _relatorio_remocoes(quadro)
+
+    duplicada = marcar_duplicatas(quadro, origem, chaves, modo, tolerancia_dias, n_particoes)
+
+    relatorio = _relatorio_remocoes(quadro[duplicada])
+    quadro_dedup = quadro[~duplicada].copy()
+
+    print(f"Deduplicar notificações ({modo}): {len(quadro)} -> {len(quadro_dedup)} linhas "
+          f"({int(duplicada.sum())} duplicatas removidas).")
+    return quadro_dedup, relatorio
+
+
+def leitor_geral_deduplicado_zip(
+    caminhos_zip: list[str],
+    colunas: list[str],
+    chaves: list[str] = CHAVES_PADRAO,
+    modo: str = "exato",
+    tolerancia_dias: int = 3,
+    motor: str = "pandas",
+    fracao_amostra: float | None = None,
+    semente: int = 42,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Versão em fluxo de leitor_geral_especifico_zip + deduplicar_notificacoes.
+
+    Lê um .zip por vez e compara as linhas novas apenas com as chaves
+    (hash + datas em dias, 24 bytes por linha) das linhas aceitas dos
+    arquivos anteriores, sem precisar reprocessar esses arquivos. Linhas do
+    mesmo arquivo não são comparadas entre si.
+
+    Com 'fracao_amostra', cada arquivo já deduplicado é reduzido a uma
+    amostra estratificada (ver amostragem.amostra_estratificada).
+
+    Retorna:
+    - DataFrame concatenado e sem duplicatas
+    - relatório com o número de duplicatas removidas por ano e UF
+    """
+    tolerancia = tolerancia_dias if modo == "aproximado" else 0
+
+    partes = []
+    relatorios = []
+    estado_bloco = np.empty(0, dtype=np.uint64)
+    estado_dias = None
+    total_lido = 0
+
+    for caminho in caminhos_zip:
+        quadro = leitor_csv_zip(caminho, colunas, motor=motor)
+        if quadro.empty:
+            continue
+        total_lido += len(quadro)
+
+        bloco, dias = _chaves_em_arrays(quadro, chaves)
+        if estado_dias is None:
+            estado_dias = [np.empty(0, dtype=np.int64) for _ in dias]
+
+        duplicada = _marcar_contra_aceitas(estado_bloco, estado_dias, bloco, dias, tolerancia)
+
+        relatorios.append(_relatorio_remocoes(quadro[duplicada]))
+        aceitas = quadro[~duplicada]
+        if fracao_amostra is not None:
+            # amostra só depois da deduplicação, para os pesos expandirem
+            # para o número de casos distintos (o estado guarda todas as aceitas)
+            aceitas = amostra_estratificada(
+                aceitas, fracao_amostra, semente, rotulo=os.path.basename(caminho)
+            )
+        partes.append(aceitas)
+
+        estado_bloco = np.concatenate([estado_bloco, bloco[~duplicada]])
+        estado_dias = [np.concatenate([e, d[~duplicada]]) for e, d in zip(estado_dias, dias)]
+
+    if not partes:
+        return pd.DataFrame(), _relatorio_remocoes(pd.DataFrame())
+
+    dados_finais = pd.concat(partes, ignore_index=True)
+    relatorio = pd.concat(relatorios, ignore_index=True)
+    if not relatorio.empty:
+        chaves_rel = [c for c in relatorio.columns if c != "duplicatas_removidas"]
+        relatorio = relatorio.groupby(chaves_rel, as_index=False)["duplicatas_removidas"].sum()
+
+    print(f"Total de linhas após leitura deduplicada (zip): {total_lido} -> {len(dados_finais)}")
+    return dados_finais, relatorio
@@ -2,21 +2,33 @@ import pandas as pd
 import numpy as np
 from scipy.stats import iqr
 
+from algoritmos.indice import selecionar_uf, QuadroIndexado
+from algoritmos.cache import cache_resultado
+from algoritmos.tabulacao import tabulacao_cruzada, tabela_cruzada_para_quadro
+from algoritmos.amostragem import (
+    estimar_contagens,
+    pesos_contagem,
+    eh_amostra,
+    erro_padrao_tabulacao,
+    adicionar_intervalos,
+)
+
 # -------------------------------------------------------------------
 # EVOLUÇÃO TEMPORAL – ESTADO DE SÃO PAULO (OU OUTRO UF)
 # -------------------------------------------------------------------
 
-def contagem_semanal_uf(quadro: pd.DataFrame, uf_cod: int = 35) -> pd.DataFrame:
+@cache_resultado(versao=2)
+def contagem_semanal_uf(quadro: pd.DataFrame | QuadroIndexado, uf_cod: int = 35) -> pd.DataFrame:
     """
     Retorna um DataFrame com o número de casos por ano e semana epidemiológica
     para uma UF específica (padrão: 35 = São Paulo).
 
     Saída: colunas ['nu_ano', 'semana_ep', 'casos']
+    (em dados amostrados, 'casos' é o total estimado, com as colunas extras
+    'erro_padrao', 'ic95_inf' e 'ic95_sup')
     """
-    df = quadro.copy()
-
     # Filtrar UF
-    df = df[df["sg_uf_not"] == uf_cod]
+    df = selecionar_uf(quadro, uf_cod).copy()
 
     # Garantir que sem_not é numérico e não nulo
     df = df[df["sem_not"].notna()]
@@ -26,32 +38,26 @@ def contagem_semanal_uf(quadro: pd.DataFrame, uf_cod: int = 35) -> pd.DataFrame:
     # Extrair semana epidemiológica (últimos 2 dígitos, ex: 202415 -> 15)
     df["semana_ep"] = (df["sem_not"] % 100).astype(int)
 
-    semana = (
-        df.groupby(["nu_ano", "semana_ep"], as_index=False)
-          .size()
-          .rename(columns={"size": "casos"})
-    )
+    semana = estimar_contagens(df, ["nu_ano", "semana_ep"], "casos")
 
     return semana
 
 
-def contagem_anual_uf(quadro: pd.DataFrame, uf_cod: int = 35) -> pd.DataFrame:
+@cache_resultado(versao=2)
+def contagem_anual_uf(quadro: pd.DataFrame | QuadroIndexado, uf_cod: int = 35) -> pd.DataFrame:
     """
     Retorna um DataFrame com o número total de casos por ano para uma UF específica.
     Saída: colunas ['nu_ano', 'casos']
+    (em dados amostrados, com 'erro_padrao', 'ic95_inf' e 'ic95_sup')
     """
-    df = quadro.copy()
-    df = df[df["sg_uf_not"] == uf_cod]
+    df = selecionar_uf(quadro, uf_cod)
 
-    ano = (
-        df.groupby("nu_ano", as_index=False)
-          .size()
-          .rename(columns={"size": "casos"})
-    )
+    ano = estimar_contagens(df, ["nu_ano"], "casos")
 
     return ano
 
 
+@cache_resultado(versao=1)
 def resumo_temporal_por_ano(semana_df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
     """
     Recebe o DataFrame de contagem semanal (nu_ano, semana_ep, casos)
@@ -108,7 +114,8 @@ def resumo_temporal_por_ano(semana_df: pd.DataFrame) -> tuple[pd.DataFrame, pd.D
 # GRAVIDADE POR ANO – ESTADO DE SÃO PAULO
 # -------------------------------------------------------------------
 
-def tabela_gravidade_por_ano_uf(quadro: pd.DataFrame, uf_cod: int = 35) -> pd.DataFrame:
+@cache_resultado(versao=4)
+def tabela_gravidade_por_ano_uf(quadro: pd.DataFrame | QuadroIndexado, uf_cod: int = 35) -> pd.DataFrame:
     """
     Retorna uma tabela com contagem de casos por ano e por CLASSI_FIN
     para uma UF específica (padrão: 35 = São Paulo).
@@ -122,34 +129,72 @@ def tabela_gravidade_por_ano_uf(quadro: pd.DataFrame, uf_cod: int = 35) -> pd.Da
     Saída: DataFrame com colunas:
         ['nu_ano', 'total', 'dengue', 'sinal_alarme', 'grave', 'outros',
          'prop_grave']
+    Em amostras, cada contagem ganha 'erro_padrao_<coluna>',
+    'ic95_inf_<coluna>' e 'ic95_sup_<coluna>'.
     """
-    df = quadro.copy()
-
     # Filtrar UF
-    df = df[df["sg_uf_not"] == uf_cod]
+    df = selecionar_uf(quadro, uf_cod)
+
+    # Contagem por ano x classificação numa só passada
+    # (em dados amostrados ou agregados, soma dos pesos/frequências)
+    tab = tabulacao_cruzada({
+        "nu_ano": df["nu_ano"],
+        "classi_fin": pd.to_numeric(df["classi_fin"], errors="coerce"),
+    }, pesos=pesos_contagem(df))
+
+    tabela = montar_tabela_gravidade(tab.eixos[0], tab.eixos[1], tab.contagem)
+    if eh_amostra(df):
+        tabela = _intervalos_gravidade(df, tabela)
+    return tabela
 
-    # Garantir numérico
-    df["classi_fin"] = pd.to_numeric(df["classi_fin"], errors="coerce")
 
-    # Contagem por ano e classificação
-    contagem = (
-        df.groupby(["nu_ano", "classi_fin"], as_index=False)
-          .size()
-          .rename(columns={"size": "casos"})
+def _intervalos_gravidade(df: pd.DataFrame, tabela: pd.DataFrame) -> pd.DataFrame:
+    """
+    Erro padrão e intervalo de 95% das contagens da tabela de gravidade
+    (amostra estratificada). O total soma quatro classificações, então seu
+    erro vem de uma tabulação própria, condicionada a essas classes.
+    """
+    classi = pd.to_numeric(df["classi_fin"], errors="coerce")
+    (anos, classes), erro, _ = erro_padrao_tabulacao(
+        {"nu_ano": df["nu_ano"], "classi_fin": classi}, df
     )
+    erro = pd.DataFrame(erro, index=anos, columns=classes).reindex(tabela["nu_ano"])
 
-    # Pivotar para colunas por tipo
-    tabela = contagem.pivot(index="nu_ano", columns="classi_fin", values="casos").fillna(0)
+    for nome, codigo in [("dengue", 10.0), ("sinal_alarme", 11.0), ("grave", 12.0), ("outros", 8.0)]:
+        coluna = erro[codigo].fillna(0.0) if codigo in erro.columns else 0.0
+        tabela = adicionar_intervalos(tabela, nome, coluna)
 
-    tabela.reset_index(inplace=True)
+    (anos,), _, erro_total = erro_padrao_tabulacao(
+        {"nu_ano": df["nu_ano"]}, df, condicao=classi.isin([10, 11, 12, 8])
+    )
+    erro_total = pd.Series(erro_total, index=anos).reindex(tabela["nu_ano"]).fillna(0.0)
+    return adicionar_intervalos(tabela, "total", erro_total)
+
+
+def montar_tabela_gravidade(anos: pd.Index, classes: pd.Index, contagem: np.ndarray) -> pd.DataFrame:
+    """
+    Passo final de tabela_gravidade_por_ano_uf, comum às versões pandas e
+    lazy (consulta_lazy): recebe a contagem ano x CLASSI_FIN (linhas = anos,
+    colunas = classes) e monta as colunas por tipo, o total e a proporção
+    de casos graves.
+    """
+    # só anos com pelo menos um caso classificado (como no pivot)
+    anos_com_casos = contagem.sum(axis=1) > 0
+    contagem = contagem[anos_com_casos]
+    if (contagem == 0).any():
+        # combinações vazias viravam NaN -> 0.0 no pivot, deixando as colunas em float
+        contagem = contagem.astype(float)
+
+    def _coluna(codigo: float):
+        return contagem[:, classes.get_loc(codigo)] if codigo in classes else 0
 
     # Renomear colunas conforme o código
     tabela_final = pd.DataFrame({
-        "nu_ano": tabela["nu_ano"],
-        "dengue": tabela.get(10.0, 0),
-        "sinal_alarme": tabela.get(11.0, 0),
-        "grave": tabela.get(12.0, 0),
-        "outros": tabela.get(8.0, 0),
+        "nu_ano": anos[anos_com_casos],
+        "dengue": _coluna(10.0),
+        "sinal_alarme": _coluna(11.0),
+        "grave": _coluna(12.0),
+        "outros": _coluna(8.0),
     })
 
     tabela_final["total"] = (
@@ -208,51 +253,66 @@ def faixa_etaria(idade: float) -> str:
         return "60+"
     
 
-def perfil_demografico(quadro: pd.DataFrame) -> pd.DataFrame:
+def faixas_etarias(idades: pd.Series) -> pd.Series:
     """
-    Analisa o perfil demográfico (idade e sexo) dos casos de dengue,
-    segmentando por faixa etária e sexo, além de calcular a proporção de casos graves.
+    Versão vetorizada de faixa_etaria: aplica a função só aos valores
+    distintos de idade e espalha o resultado pelos códigos.
     """
-    df = quadro[quadro['sg_uf_not'] == 35].copy()
-
-    # Criação da coluna 'faixa_etaria' a partir de 'NU_IDADE_N'
-    df['faixa_etaria'] = df['nu_idade_n'].apply(faixa_etaria)
+    codigos, valores = pd.factorize(idades)
+    faixas = np.array([faixa_etaria(v) for v in valores] + ["Desconhecida"], dtype=object)
+    # código -1 (idade ausente) cai na última posição: "Desconhecida"
+    return pd.Series(faixas[codigos], index=idades.index, name="faixa_etaria")
 
-    # Filtrando apenas os casos graves
-    casos_graves = df[df['classi_fin'] == 12]
 
-    # Contagem por faixa etária e sexo
-    perfil_geral = df.groupby(['faixa_etaria', 'cs_sexo']).size().reset_index(name='total')
-    perfil_graves = casos_graves.groupby(['faixa_etaria', 'cs_sexo']).size().reset_index(name='total_graves')
+def _perfil_com_graves(df: pd.DataFrame, dimensoes: list[str]) -> pd.DataFrame:
+    """
+    Total e total de graves (CLASSI_FIN == 12) por combinação das dimensões,
+    calculados juntos na tabulação cruzada.
 
-    # Merge para ter o perfil geral e o de casos graves na mesma tabela
-    perfil = pd.merge(perfil_geral, perfil_graves, on=['faixa_etaria', 'cs_sexo'], how='left')
-    perfil['proporcao_graves'] = perfil['total_graves'] / perfil['total']
+    Combinações sem caso grave ficam com total_graves ausente (NaN), como no
+    merge 'left' entre os dois groupby usados antes. Em amostras, total e
+    total_graves ganham erro padrão e intervalo de 95%.
+    """
+    colunas = {
+        d: faixas_etarias(df["nu_idade_n"]) if d == "faixa_etaria" else df[d]
+        for d in dimensoes
+    }
+    condicao = df["classi_fin"] == 12
+    tab = tabulacao_cruzada(colunas, condicao=condicao, pesos=pesos_contagem(df))
+
+    perfil = tabela_cruzada_para_quadro(tab, "total", "total_graves")
+    perfil["total_graves"] = perfil["total_graves"].where(perfil["total_graves"] > 0)
+    perfil["proporcao_graves"] = perfil["total_graves"] / perfil["total"]
+
+    if eh_amostra(df):
+        # mesmas células (e mesma ordem) de tabela_cruzada_para_quadro
+        _, erro, erro_graves = erro_padrao_tabulacao(colunas, df, condicao=condicao)
+        posicoes = np.nonzero(tab.contagem)
+        perfil = adicionar_intervalos(perfil, "total", erro[posicoes])
+        perfil = adicionar_intervalos(perfil, "total_graves", erro_graves[posicoes])
 
     return perfil
 
 
-def perfil_por_ano(quadro: pd.DataFrame) -> pd.DataFrame:
+@cache_resultado(versao=4)
+def perfil_demografico(quadro: pd.DataFrame | QuadroIndexado, uf_cod: int = 35) -> pd.DataFrame:
     """
-    Analisa a evolução do perfil demográfico ao longo do tempo.
+    Analisa o perfil demográfico (idade e sexo) dos casos de dengue,
+    segmentando por faixa etária e sexo, além de calcular a proporção de casos graves.
     """
-    df = quadro[quadro['sg_uf_not'] == 35].copy()
+    df = selecionar_uf(quadro, uf_cod)
 
-    # Criação da coluna 'faixa_etaria' a partir de 'NU_IDADE_N'
-    df['faixa_etaria'] = df['nu_idade_n'].apply(faixa_etaria)
+    return _perfil_com_graves(df, ["faixa_etaria", "cs_sexo"])
 
-    # Filtrando apenas os casos graves
-    casos_graves = df[df['classi_fin'] == 12]
 
-    # Contagem por ano, faixa etária e sexo
-    perfil_geral_ano = df.groupby(['nu_ano', 'faixa_etaria', 'cs_sexo']).size().reset_index(name='total')
-    perfil_graves_ano = casos_graves.groupby(['nu_ano', 'faixa_etaria', 'cs_sexo']).size().reset_index(name='total_graves')
-
-    # Merge para ter o perfil geral e o de casos graves na mesma tabela
-    perfil_ano = pd.merge(perfil_geral_ano, perfil_graves_ano, on=['nu_ano', 'faixa_etaria', 'cs_sexo'], how='left')
-    perfil_ano['proporcao_graves'] = perfil_ano['total_graves'] / perfil_ano['total']
+@cache_resultado(versao=4)
+def perfil_por_ano(quadro: pd.DataFrame | QuadroIndexado, uf_cod: int = 35) -> pd.DataFrame:
+    """
+    Analisa a evolução do perfil demográfico ao longo do tempo.
+    """
+    df = selecionar_uf(quadro, uf_cod)
 
-    return perfil_ano
+    return _perfil_com_graves(df, ["nu_ano", "faixa_etaria", "cs_sexo"])
 
 
 
@@ -261,8 +321,9 @@ def perfil_por_ano(quadro: pd.DataFrame) -> pd.DataFrame:
 
 
 
+@cache_resultado(versao=3)
 def casos_por_municipio_sp(
-    quadro: pd.DataFrame,
+    quadro: pd.DataFrame | QuadroIndexado,
     mapa_mun_sp: pd.DataFrame,
     uf_cod: int = 35,
     top_n: int = 20,
@@ -270,11 +331,10 @@ def casos_por_municipio_sp(
     """
     TOP N municípios de SP em número de casos notificados.
     Usa ID_MN_RESI (código do município de residência) + mapa para nome.
+    Em amostras, mantém as colunas erro_padrao, ic95_inf e ic95_sup.
     """
-    df = quadro.copy()
-
     # filtra SP
-    df_sp = df[df["sg_uf_not"] == uf_cod].copy()
+    df_sp = selecionar_uf(quadro, uf_cod).copy()
 
     # padroniza ID_MN_RESI como string de 6 dígitos
     df_sp["id_mn_resi_6"] = (
@@ -284,11 +344,7 @@ def casos_por_municipio_sp(
         .str.zfill(6)
     )
 
-    contagem = (
-        df_sp.groupby("id_mn_resi_6")
-        .size()
-        .reset_index(name="casos")
-    )
+    contagem = estimar_contagens(df_sp, ["id_mn_resi_6"], "casos")
 
     # junta com o mapa de municípios
     tabela = contagem.merge(mapa_mun_sp, on="id_mn_resi_6", how="left")
@@ -303,13 +359,15 @@ def casos_por_municipio_sp(
     )
 
     # ordena colunas de forma amigável
-    tabela = tabela[["id_mn_resi_6", "municipio_nome", "casos"]]
+    intervalo = [c for c in ("erro_padrao", "ic95_inf", "ic95_sup") if c in tabela.columns]
+    tabela = tabela[["id_mn_resi_6", "municipio_nome", "casos"] + intervalo]
 
     return tabela
 
 
+@cache_resultado(versao=3)
 def casos_graves_por_municipio_sp(
-    quadro: pd.DataFrame,
+    quadro: pd.DataFrame | QuadroIndexado,
     mapa_mun_sp: pd.DataFrame,
     uf_cod: int = 35,
     top_n: int = 20,
@@ -319,10 +377,10 @@ def casos_graves_por_municipio_sp(
       - total_casos
       - total_graves
       - proporcao_graves
+    Em amostras, total_casos e total_graves ganham erro padrão e intervalo
+    de 95% ('erro_padrao_<coluna>', 'ic95_inf_<coluna>', 'ic95_sup_<coluna>').
     """
-    df = quadro.copy()
-
-    df_sp = df[df["sg_uf_not"] == uf_cod].copy()
+    df_sp = selecionar_uf(quadro, uf_cod).copy()
 
     df_sp["id_mn_resi_6"] = (
         df_sp["id_mn_resi"]
@@ -331,21 +389,27 @@ def casos_graves_por_municipio_sp(
         .str.zfill(6)
     )
 
-    total = (
-        df_sp.groupby("id_mn_resi_6")
-        .size()
-        .reset_index(name="total_casos")
-    )
+    total = estimar_contagens(df_sp, ["id_mn_resi_6"], "total_casos")
 
     graves = df_sp[df_sp["classi_fin"] == 12]
-    total_graves = (
-        graves.groupby("id_mn_resi_6")
-        .size()
-        .reset_index(name="total_graves")
-    )
+    total_graves = estimar_contagens(graves, ["id_mn_resi_6"], "total_graves")
+
+    amostra = eh_amostra(df_sp)
+    intervalo = ["erro_padrao", "ic95_inf", "ic95_sup"] if amostra else []
 
-    tabela = total.merge(total_graves, on="id_mn_resi_6", how="left")
-    tabela["total_graves"] = tabela["total_graves"].fillna(0).astype(int)
+    def _com_sufixo(contagem: pd.DataFrame, nome: str) -> pd.DataFrame:
+        return contagem[["id_mn_resi_6", nome] + intervalo].rename(
+            columns={c: f"{c}_{nome}" for c in intervalo}
+        )
+
+    tabela = _com_sufixo(total, "total_casos").merge(
+        _com_sufixo(total_graves, "total_graves"), on="id_mn_resi_6", how="left"
+    )
+    # município sem caso grave na amostra: estimativa 0, erro 0
+    colunas_graves = ["total_graves"] + [f"{c}_total_graves" for c in intervalo]
+    tabela[colunas_graves] = tabela[colunas_graves].fillna(0)
+    if not amostra:
+        tabela["total_graves"] = tabela["total_graves"].astype(int)
     tabela["proporcao_graves"] = tabela["total_graves"] / tabela["total_casos"]
 
     tabela = tabela.merge(mapa_mun_sp, on="id_mn_resi_6", how="left")
@@ -359,6 +423,7 @@ def casos_graves_por_municipio_sp(
 
     tabela = tabela[
         ["id_mn_resi_6", "municipio_nome", "total_casos", "total_graves", "proporcao_graves"]
+        + [f"{c}_{nome}" for nome in ("total_casos", "total_graves") for c in intervalo]
     ]
 
     return tabela
\ No newline at end of file
@@ -0,0 +1,346 @@
+import os
+import glob
+import shutil
+import zipfile
+from typing import NamedTuple
+
+import pandas as pd
+import numpy as np
+
+from algoritmos.amostragem import COLUNA_FREQUENCIA
+from algoritmos.validacao import validar_dados, contagem_por_regra
+from algoritmos.filtragem import filtrar_classificados
+from algoritmos.estatisticas import (
+    contagem_semanal_uf,
+    contagem_anual_uf,
+    tabela_gravidade_por_ano_uf,
+    perfil_demografico,
+    perfil_por_ano,
+    casos_por_municipio_sp,
+    casos_graves_por_municipio_sp,
+)
+
+# -------------------------------------------------------------------
+# EXECUÇÃO COM LIMITE DE MEMÓRIA (BLOCOS + AGREGADOS PARCIAIS EM DISCO)
+# -------------------------------------------------------------------
+#
+# Para a base nacional que não cabe na memória: cada .zip é lido em blocos
+# de linhas dimensionados pelo limite, cada bloco passa pela mesma limpeza
+# do caminho em memória e é reduzido a cubos de contagem (uma linha por
+# combinação de valores + frequência). Os cubos parciais ficam na memória
+# até ocuparem a parte do limite reservada a eles; daí são gravados em
+# disco, particionados por UF, e combinados UF a UF no final.
+#
+# As estatísticas são as funções de algoritmos/estatisticas.py aplicadas
+# aos cubos (elas somam a coluna de frequência no lugar de contar linhas),
+# então os resultados são os mesmos do caminho em memória.
+
+# Dimensões de cada cubo: só o necessário para as funções que o usam
+CUBOS = {
+    # contagem semanal, contagem anual e gravidade
+    "temporal": ["sg_uf_not", "nu_ano", "sem_not", "classi_fin"],
+    # perfis demográficos
+    "perfil": ["sg_uf_not", "nu_ano", "nu_idade_n", "cs_sexo", "classi_fin"],
+    # rankings de municípios
+    "municipio": ["sg_uf_not", "nu_ano", "id_mn_resi", "classi_fin"],
+}
+
+# Pico de memória por byte do bloco lido: buffers do parser, colunas
+# convertidas e cópias feitas pela validação e pelo filtro (medido na
+# base DENGBR com as colunas de main.py)
+FATOR_TRABALHO = 10
+
+# Memória que não depende do tamanho do bloco: buffers do leitor de CSV,
+# descompressão do zip e arenas do alocador
+CUSTO_FIXO_BYTES = 64 * 2**20
+
+# Parte do limite reservada aos cubos parciais (o resto fica para o bloco)
+FRACAO_AGREGADOS = 0.25
+
+LINHAS_MINIMAS_BLOCO = 10_000
+
+
+class PlanoExecucao(NamedTuple):
+    """
+    Resultado de planejar_execucao:
+    - limite_bytes: memória disponível para os dados (limite - uso atual - custo fixo)
+    - bytes_por_linha: tamanho estimado de uma linha já carregada
+    - linhas_por_bloco: linhas lidas de cada vez
+    - limite_agregados: bytes de cubos parciais mantidos antes do despejo em disco
+    - linhas_estimadas: estimativa do total de linhas dos arquivos
+    """
+    limite_bytes: int
+    bytes_por_linha: float
+    linhas_por_bloco: int
+    limite_agregados: int
+    linhas_estimadas: int
+
+
+def memoria_residente() -> int:
+    """
+    Memória residente (RSS) atual do processo, em bytes. Usa /proc no
+    Linux; nos outros sistemas, o pico registrado pelo módulo resource.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return pico_memoria_residente()
+
+
+def pico_memoria_residente() -> int:
+    """
+    Pico de memória residente do processo, em bytes.
+    """
+    import resource
+    import sys
+
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KiB, macOS em bytes
+    return pico if sys.platform == "darwin" else pico * 1024
+
+
+def _abrir_csv_zip(z: zipfile.ZipFile, caminho_zip: str) -> str | None:
+    csvs = [arq for arq in z.namelist() if arq.lower().endswith(".csv")]
+    if not csvs:
+        print(f"Nenhum arquivo .csv encontrado dentro de {caminho_zip}")
+        return None
+    return csvs[0]
+
+
+def planejar_execucao(
+    caminhos_zip: list[str],
+    colunas: list[str],
+    limite_memoria_mb: float,
+    linhas_amostra: int = 20_000,
+) -> PlanoExecucao:
+    """
+    Dimensiona os blocos de leitura para o limite de memória.
+
+    Lê as primeiras 'linhas_amostra' linhas do primeiro arquivo para medir
+    o tamanho de uma linha carregada e a razão entre bytes do CSV e linhas;
+    com isso estima o total de linhas (pelo tamanho descompactado dos CSVs)
+    e quantas linhas cabem num bloco.
+    """
+    em_uso = memoria_residente()
+    limite_bytes = int(limite_memoria_mb * 2**20) - em_uso - CUSTO_FIXO_BYTES
+    if limite_bytes <= 0:
+        raise MemoryError(
+            f"Limite de {limite_memoria_mb} MB insuficiente: o processo já usa "
+            f"{em_uso / 2**20:.0f} MB e a leitura em blocos precisa de pelo menos "
+            f"{CUSTO_FIXO_BYTES / 2**20:.0f} MB além disso."
+        )
+
+    bytes_por_linha = None
+    bytes_csv_por_linha = None
+    bytes_csv_total = 0
+    for caminho in caminhos_zip:
+        with zipfile.ZipFile(caminho, "r") as z:
+            csv = _abrir_csv_zip(z, caminho)
+            if csv is None:
+                continue
+            bytes_csv_total += z.getinfo(csv).file_size
+
+            if bytes_por_linha is None:
+                with z.open(csv) as f:
+                    amostra = pd.read_csv(f, usecols=colunas, nrows=linhas_amostra, low_memory=False)
+                with z.open(csv) as f:
+                    bytes_lidos = sum(len(linha) for _, linha in zip(range(len(amostra) + 1), f))
+                if len(amostra):
+                    bytes_por_linha = amostra.memory_usage(deep=True).sum() / len(amostra)
+                    bytes_csv_por_linha = bytes_lidos / (len(amostra) + 1)
+
+    if bytes_por_linha is None:
+        return PlanoExecucao(limite_bytes, 0.0, LINHAS_MINIMAS_BLOCO, 0, 0)
+
+    limite_agregados = int(limite_bytes * FRACAO_AGREGADOS)
+    linhas_por_bloco = int((limite_bytes - limite_agregados) / (bytes_por_linha * FATOR_TRABALHO))
+    linhas_por_bloco = max(linhas_por_bloco, LINHAS_MINIMAS_BLOCO)
+
+    plano = PlanoExecucao(
+        limite_bytes=limite_bytes,
+        bytes_por_linha=float(bytes_por_linha),
+        linhas_por_bloco=linhas_por_bloco,
+        limite_agregados=limite_agregados,
+        linhas_estimadas=int(bytes_csv_total / bytes_csv_por_linha),
+    )
+    print(f"Plano de execução: ~{plano.linhas_estimadas} linhas, blocos de "
+          f"{plano.linhas_por_bloco} linhas (~{bytes_por_linha:.0f} B/linha), "
+          f"{plano.limite_agregados / 2**20:.0f} MB para agregados parciais.")
+    return plano
+
+
+def _blocos_csv_zip(caminho_zip: str, colunas: list[str], linhas_por_bloco: int):
+    """
+    Gera o CSV de um .zip em blocos de 'linhas_por_bloco' linhas, com os
+    nomes de colunas em minúsculas (como leitor_csv_zip).
+    """
+    with zipfile.ZipFile(caminho_zip, "r") as z:
+        csv = _abrir_csv_zip(z, caminho_zip)
+        if csv is None:
+            return
+        print(f"Lendo {csv} de dentro de {caminho_zip} em blocos de {linhas_por_bloco} linhas")
+
+        with z.open(csv) as f:
+            for bloco in pd.read_csv(f, usecols=colunas, chunksize=linhas_por_bloco):
+                bloco.columns = [c.lower() for c in bloco.columns]
+                yield bloco
+
+
+def _agregar(quadro: pd.DataFrame, dimensoes: list[str]) -> pd.DataFrame:
+    """
+    Cubo de contagem: uma linha por combinação das dimensões (ausentes
+    inclusive) com a frequência. Cubos também podem ser reagregados.
+    """
+    dimensoes = [d for d in dimensoes if d in quadro.columns]
+    if COLUNA_FREQUENCIA in quadro.columns:
+        agrupado = quadro.groupby(dimensoes, dropna=False, sort=False)[COLUNA_FREQUENCIA].sum()
+    else:
+        agrupado = quadro.groupby(dimensoes, dropna=False, sort=False).size()
+    return agrupado.rename(COLUNA_FREQUENCIA).reset_index()
+
+
+def _despejar(parciais: dict[str, list[pd.DataFrame]], diretorio: str, numero: int):
+    """
+    Combina os cubos parciais em memória e grava cada um em disco,
+    um arquivo por UF, esvaziando as listas.
+    """
+    for nome, lista in parciais.items():
+        if not lista:
+            continue
+        cubo = _agregar(pd.concat(lista, ignore_index=True), CUBOS[nome])
+        lista.clear()
+        for uf, parte in cubo.groupby("sg_uf_not", dropna=False, sort=False):
+            pasta = os.path.join(diretorio, nome, f"uf={uf}")
+            os.makedirs(pasta, exist_ok=True)
+            parte.to_pickle(os.path.join(pasta, f"parte_{numero:05d}.pkl"))
+
+
+def _combinar_despejos(nome: str, parciais: list[pd.DataFrame], diretorio: str) -> pd.DataFrame:
+    """
+    Cubo final: agrega, UF a UF, as partes gravadas em disco com os
+    parciais que ainda estão em memória.
+    """
+    em_memoria = (
+        _agregar(pd.concat(parciais, ignore_index=True), CUBOS[nome]) if parciais else None
+    )
+    pastas = sorted(glob.glob(os.path.join(diretorio, nome, "uf=*")))
+
+    finais = []
+    ufs_em_disco = set()
+    for pasta in pastas:
+        uf_texto = os.path.basename(pasta)[len("uf="):]
+        partes = [pd.read_pickle(arq) for arq in sorted(glob.glob(os.path.join(pasta, "*.pkl")))]
+        if em_memoria is not None:
+            ufs_em_disco.add(uf_texto)
+            partes.append(em_memoria[em_memoria["sg_uf_not"].astype(str) == uf_texto])
+        finais.append(_agregar(pd.concat(partes, ignore_index=True), CUBOS[nome]))
+
+    if em_memoria is not None:
+        finais.append(em_memoria[~em_memoria["sg_uf_not"].astype(str).isin(ufs_em_disco)])
+
+    if not finais:
+        return pd.DataFrame(columns=CUBOS[nome] + [COLUNA_FREQUENCIA])
+    return pd.concat(finais, ignore_index=True)
+
+
+def agregar_com_limite_memoria(
+    caminhos_zip: list[str],
+    colunas: list[str],
+    limite_memoria_mb: float = 1024,
+    validar: bool = True,
+    diretorio_despejo: str = ".despejo_agregados",
+) -> dict[str, pd.DataFrame]:
+    """
+    Lê os .zip em blocos que cabem em 'limite_memoria_mb' e devolve os
+    cubos de contagem (ver CUBOS) de toda a base, depois da mesma limpeza
+    de carregar_dados(deduplicar=False): validação (sem arquivo de
+    quarentena) e remoção dos casos descartados.
+
+    A deduplicação entre arquivos não é aplicada: ela precisa das chaves de
+    todas as linhas já aceitas, o que não cabe no limite de memória.
+    """
+    plano = planejar_execucao(caminhos_zip, colunas, limite_memoria_mb)
+
+    if os.path.isdir(diretorio_despejo):
+        shutil.rmtree(diretorio_despejo)
+
+    parciais: dict[str, list[pd.DataFrame]] = {nome: [] for nome in CUBOS}
+    bytes_parciais = 0
+    n_despejos = 0
+    falhas = None
+    total_lido = 0
+
+    try:
+        for caminho in caminhos_zip:
+            for bloco in _blocos_csv_zip(caminho, colunas, plano.linhas_por_bloco):
+                total_lido += len(bloco)
+
+                if validar:
+                    bloco, contagem = validar_dados(bloco, caminho_quarentena=None)
+                    falhas = contagem if falhas is None else falhas.assign(
+                        linhas=falhas["linhas"] + contagem["linhas"],
+                        ausentes=falhas["ausentes"] + contagem["ausentes"],
+                    )
+                bloco = filtrar_classificados(bloco)
+
+                for nome, dimensoes in CUBOS.items():
+                    cubo = _agregar(bloco, dimensoes)
+                    parciais[nome].append(cubo)
+                    bytes_parciais += cubo.memory_usage(deep=True).sum()
+                del bloco
+
+                if bytes_parciais > plano.limite_agregados:
+                    _despejar(parciais, diretorio_despejo, n_despejos)
+                    n_despejos += 1
+                    bytes_parciais = 0
+
+        cubos = {
+            nome: _combinar_despejos(nome, parciais[nome], diretorio_despejo)
+            for nome in CUBOS
+        }
+    finally:
+        if os.path.isdir(diretorio_despejo):
+            shutil.rmtree(diretorio_despejo)
+
+    if validar:
+        if falhas is None:
+            falhas = contagem_por_regra(np.zeros(0, dtype=np.uint32))
+        print("\nLinhas reprovadas por regra de validação:")
+        print(falhas)
+
+    print(f"Agregação com limite de memória: {total_lido} linhas lidas, "
+          f"{n_despejos} despejos em disco, pico de memória "
+          f"{pico_memoria_residente() / 2**20:.0f} MB (limite {limite_memoria_mb} MB).")
+    return cubos
+
+
+def estatisticas_com_limite_memoria(
+    caminhos_zip: list[str],
+    colunas: list[str],
+    uf_cod: int = 35,
+    limite_memoria_mb: float = 1024,
+    mapa_mun: pd.DataFrame | None = None,
+    top_n: int = 20,
+    validar: bool = True,
+) -> dict[str, pd.DataFrame]:
+    """
+    As tabelas das análises de uma UF (contagens, gravidade, perfis e
+    rankings de municípios) calculadas sem carregar a base inteira.
+    """
+    cubos = agregar_com_limite_memoria(caminhos_zip, colunas, limite_memoria_mb, validar)
+
+    if mapa_mun is None:
+        mapa_mun = pd.DataFrame(columns=["id_mn_resi_6", "municipio_nome"])
+
+    return {
+        "contagem_semanal": contagem_semanal_uf(cubos["temporal"], uf_cod=uf_cod),
+        "contagem_anual": contagem_anual_uf(cubos["temporal"], uf_cod=uf_cod),
+        "gravidade": tabela_gravidade_por_ano_uf(cubos["temporal"], uf_cod=uf_cod),
+        "perfil_demografico": perfil_demografico(cubos["perfil"], uf_cod=uf_cod),
+        "perfil_por_ano": perfil_por_ano(cubos["perfil"], uf_cod=uf_cod),
+        "casos_por_municipio": casos_por_municipio_sp(
+            cubos["municipio"], mapa_mun, uf_cod=uf_cod, top_n=top_n),
+        "casos_graves_por_municipio": casos_graves_por_municipio_sp(
+            cubos["municipio"], mapa_mun, uf_cod=uf_cod, top_n=top_n),
+    }
@@ -0,0 +1,231 @@
+import os
+import sqlite3
+
+import pandas as pd
+
+from algoritmos.filtragem import UF_IBGE
+from algoritmos.indice import selecionar, QuadroIndexado
+from algoritmos.estatisticas import (
+    contagem_semanal_uf,
+    tabela_gravidade_por_ano_uf,
+    perfil_demografico,
+    perfil_por_ano,
+    casos_graves_por_municipio_sp,
+)
+
+# -------------------------------------------------------------------
+# EXPORTAÇÃO DOS RESULTADOS PARA SQLITE
+# -------------------------------------------------------------------
+
+# Estrutura de cada tabela: colunas (nome, tipo), chave primária e índices
+# para as consultas mais comuns dos painéis.
+TABELAS = {
+    "contagem_semanal": {
+        "colunas": [
+            ("sg_uf_not", "INTEGER"), ("nu_ano", "INTEGER"),
+            ("semana_ep", "INTEGER"), ("casos", "INTEGER"),
+        ],
+        "chave": ["sg_uf_not", "nu_ano", "semana_ep"],
+        "indices": [["nu_ano", "semana_ep"]],
+    },
+    "gravidade_anual": {
+        "colunas": [
+            ("sg_uf_not", "INTEGER"), ("nu_ano", "INTEGER"),
+            ("dengue", "REAL"), ("sinal_alarme", "REAL"), ("grave", "REAL"),
+            ("outros", "REAL"), ("total", "REAL"), ("prop_grave", "REAL"),
+        ],
+        "chave": ["sg_uf_not", "nu_ano"],
+        "indices": [["nu_ano"]],
+    },
+    "perfil_demografico": {
+        "colunas": [
+            ("sg_uf_not", "INTEGER"), ("faixa_etaria", "TEXT"), ("cs_sexo", "TEXT"),
+            ("total", "INTEGER"), ("total_graves", "REAL"), ("proporcao_graves", "REAL"),
+        ],
+        "chave": ["sg_uf_not", "faixa_etaria", "cs_sexo"],
+        "indices": [],
+    },
+    "perfil_por_ano": {
+        "colunas": [
+            ("sg_uf_not", "INTEGER"), ("nu_ano", "INTEGER"), ("faixa_etaria", "TEXT"),
+            ("cs_sexo", "TEXT"), ("total", "INTEGER"), ("total_graves", "REAL"),
+            ("proporcao_graves", "REAL"),
+        ],
+        "chave": ["sg_uf_not", "nu_ano", "faixa_etaria", "cs_sexo"],
+        "indices": [["nu_ano", "faixa_etaria"]],
+    },
+    "ranking_municipios": {
+        "colunas": [
+            ("sg_uf_not", "INTEGER"), ("nu_ano", "INTEGER"), ("id_mn_resi_6", "TEXT"),
+            ("municipio_nome", "TEXT"), ("total_casos", "INTEGER"),
+            ("total_graves", "INTEGER"), ("proporcao_graves", "REAL"),
+        ],
+        "chave": ["sg_uf_not", "nu_ano", "id_mn_resi_6"],
+        "indices": [
+            ["sg_uf_not", "nu_ano", "total_casos DESC"],
+            ["sg_uf_not", "nu_ano", "total_graves DESC"],
+            ["id_mn_resi_6", "nu_ano"],
+        ],
+    },
+}
+
+
+def criar_tabelas(conexao: sqlite3.Connection):
+    """
+    Cria as tabelas e índices (se ainda não existirem).
+    """
+    with conexao:
+        for nome, estrutura in TABELAS.items():
+            colunas = ", ".join(f"{c} {t}" for c, t in estrutura["colunas"])
+            chave = ", ".join(estrutura["chave"])
+            conexao.execute(f"CREATE TABLE IF NOT EXISTS {nome} ({colunas}, PRIMARY KEY ({chave}))")
+
+            for i, colunas_indice in enumerate(estrutura["indices"]):
+                conexao.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{nome}_{i} ON {nome} ({', '.join(colunas_indice)})"
+                )
+
+
+def gravar_tabela(
+    conexao: sqlite3.Connection,
+    nome: str,
+    quadro: pd.DataFrame,
+    tamanho_lote: int = 50_000,
+    substituir: dict[str, list] | None = None,
+) -> int:
+    """
+    Insere ou atualiza (upsert pela chave primária) as linhas do quadro na
+    tabela, em lotes de 'tamanho_lote' dentro de uma única transação.
+
+    'substituir' (coluna -> valores, ex.: {"sg_uf_not": [35], "nu_ano": [2024]})
+    apaga antes, na mesma transação, as linhas que casam com todos os
+    filtros: grupos (municípios, semanas, faixas) que deixaram de ter casos
+    não ficam no banco com as contagens antigas.
+
+    Retorna o número de linhas gravadas.
+    """
+    if quadro.empty and not substituir:
+        return 0
+
+    estrutura = TABELAS[nome]
+    colunas = [c for c, _ in estrutura["colunas"]]
+    atualizaveis = [c for c in colunas if c not in estrutura["chave"]]
+
+    sql = (
+        f"INSERT INTO {nome} ({', '.join(colunas)}) "
+        f"VALUES ({', '.join('?' * len(colunas))}) "
+        f"ON CONFLICT ({', '.join(estrutura['chave'])}) DO UPDATE SET "
+        + ", ".join(f"{c} = excluded.{c}" for c in atualizaveis)
+    )
+
+    linhas = []
+    if not quadro.empty:
+        # tipos do numpy -> tipos do Python, NaN -> NULL
+        valores = quadro[colunas].astype(object).where(quadro[colunas].notna(), None)
+        linhas = list(valores.itertuples(index=False, name=None))
+
+    with conexao:
+        if substituir:
+            filtros = " AND ".join(
+                f"{coluna} IN ({', '.join('?' * len(lista))})" for coluna, lista in substituir.items()
+            )
+            parametros = [int(v) for lista in substituir.values() for v in lista]
+            conexao.execute(f"DELETE FROM {nome} WHERE {filtros}", parametros)
+        for i in range(0, len(linhas), tamanho_lote):
+            conexao.executemany(sql, linhas[i:i + tamanho_lote])
+
+    return len(linhas)
+
+
+def _com_uf(quadro: pd.DataFrame, uf_cod: int) -> pd.DataFrame:
+    quadro = quadro.copy()
+    quadro.insert(0, "sg_uf_not", uf_cod)
+    return quadro
+
+
+def exportar_resultados_sqlite(
+    quadro: pd.DataFrame | QuadroIndexado,
+    caminho_db: str = "resultados/resultados.sqlite",
+    ufs: list[int] | None = None,
+    anos: list[int] | None = None,
+    mapa_mun: pd.DataFrame | None = None,
+) -> dict[str, int]:
+    """
+    Calcula as tabelas de resultados para cada UF (contagem semanal,
+    gravidade, perfis demográficos e ranking de municípios por ano) e grava
+    tudo no banco SQLite, substituindo as linhas já gravadas de cada UF
+    (ou só dos anos atualizados).
+
+    'anos' restringe a atualização aos anos informados (ex.: só o ano
+    corrente numa atualização semanal). Nesse caso o perfil demográfico
+    acumulado, que depende de todos os anos, não é regravado.
+
+    Retorna o número de linhas gravadas por tabela.
+    """
+    if ufs is None:
+        presentes = set(pd.to_numeric(quadro["sg_uf_not"], errors="coerce").dropna().astype(int))
+        ufs = sorted(presentes & set(UF_IBGE.values()))
+
+    if mapa_mun is None:
+        mapa_mun = pd.DataFrame(columns=["id_mn_resi_6", "municipio_nome"])
+
+    pasta = os.path.dirname(caminho_db)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+
+    conexao = sqlite3.connect(caminho_db)
+    gravadas = {nome: 0 for nome in TABELAS}
+    try:
+        criar_tabelas(conexao)
+
+        for uf in ufs:
+            dados_uf = selecionar(quadro, uf_cod=uf)
+            if anos is not None:
+                dados_uf = dados_uf[dados_uf["nu_ano"].isin(anos)]
+            # sem filtro de anos, um QuadroIndexado vai inteiro para as
+            # estatísticas (fatia do índice e chave de cache do quadro todo)
+            base = quadro if anos is None and isinstance(quadro, QuadroIndexado) else dados_uf
+
+            # linhas antigas da UF (ou dos anos atualizados) saem antes do upsert
+            por_ano = {"sg_uf_not": [uf]} if anos is None else {"sg_uf_not": [uf], "nu_ano": list(anos)}
+            acumulado = {"sg_uf_not": [uf]} if anos is None else None
+
+            if dados_uf.empty:
+                for nome in TABELAS:
+                    gravar_tabela(conexao, nome, pd.DataFrame(),
+                                  substituir=acumulado if nome == "perfil_demografico" else por_ano)
+                continue
+
+            gravadas["contagem_semanal"] += gravar_tabela(
+                conexao, "contagem_semanal", _com_uf(contagem_semanal_uf(base, uf_cod=uf), uf),
+                substituir=por_ano)
+            gravadas["gravidade_anual"] += gravar_tabela(
+                conexao, "gravidade_anual", _com_uf(tabela_gravidade_por_ano_uf(base, uf_cod=uf), uf),
+                substituir=por_ano)
+            gravadas["perfil_por_ano"] += gravar_tabela(
+                conexao, "perfil_por_ano", _com_uf(perfil_por_ano(base, uf_cod=uf), uf),
+                substituir=por_ano)
+            if anos is None:
+                gravadas["perfil_demografico"] += gravar_tabela(
+                    conexao, "perfil_demografico", _com_uf(perfil_demografico(base, uf_cod=uf), uf),
+                    substituir=acumulado)
+
+            # ranking completo (todos os municípios) de cada ano
+            rankings = []
+            for ano in sorted(dados_uf["nu_ano"].dropna().unique()):
+                dados_ano = selecionar(quadro, uf_cod=uf, nu_ano=ano)
+                ranking = casos_graves_por_municipio_sp(
+                    dados_ano, mapa_mun, uf_cod=uf, top_n=len(dados_ano)
+                )
+                ranking.insert(1, "nu_ano", int(ano))
+                rankings.append(ranking)
+            gravadas["ranking_municipios"] += gravar_tabela(
+                conexao, "ranking_municipios", _com_uf(pd.concat(rankings, ignore_index=True), uf),
+                substituir=por_ano)
+
+            print(f"Exportar SQLite: UF {uf} gravada.")
+    finally:
+        conexao.close()
+
+    print(f"Exportação concluída em {caminho_db}: {gravadas}")
+    return gravadas
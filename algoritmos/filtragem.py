@@ -1,5 +1,7 @@
 import pandas as pd
 
+from algoritmos.indice import selecionar_uf
+
 # Mapeamento de sigla de UF -> código IBGE usado em SG_UF_NOT
 UF_IBGE = {
     "AC": 12, "AL": 27, "AP": 16, "AM": 13, "BA": 29, "CE": 23,
@@ -43,7 +45,7 @@ def filtrar_uf(quadro: pd.DataFrame, uf_sigla: str) -> pd.DataFrame:
     quadro["sg_uf_not"] = pd.to_numeric(quadro["sg_uf_not"], errors="coerce")
 
     antes = len(quadro)
-    quadro_filtrado = quadro[quadro["sg_uf_not"] == cod_uf].copy()
+    quadro_filtrado = selecionar_uf(quadro, cod_uf).copy()
     depois = len(quadro_filtrado)
 
     print(f"Filtrar UF {uf_sigla} (cód {cod_uf}): {antes} -> {depois} linhas.")
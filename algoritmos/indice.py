@@ -0,0 +1,240 @@
+import pandas as pd
+import numpy as np
+
+# -------------------------------------------------------------------
+# LAYOUT ORDENADO (UF, ANO, MUNICÍPIO) + ÍNDICE DE FATIAS
+# -------------------------------------------------------------------
+#
+# Depois de ordenado por (sg_uf_not, nu_ano, id_mn_resi), cada UF, cada
+# (UF, ano) e cada (UF, ano, município) ocupa um trecho contínuo de linhas.
+# O índice guarda, para cada grupo distinto, uma chave inteira composta e a
+# linha onde o grupo começa. Selecionar um grupo vira uma busca binária no
+# índice (alguns milhares de grupos) + um fatiamento por posição, sem
+# máscara booleana nem cópia das linhas.
+#
+# Quadro ordenado e índice ficam juntos em QuadroIndexado, e não em
+# DataFrame.attrs (que o pandas copia para quadros reordenados ou
+# editados). O quadro guardado não muda: quem o lê recebe uma cópia rasa,
+# e com o copy-on-write do pandas qualquer edição nela copia os dados em
+# vez de alterar o original. Quem edita fica com um DataFrame comum e, para
+# voltar a ter o índice, chama ordenar_por_uf_ano_municipio de novo.
+
+# Pesos da chave composta: uf (2 dígitos) | ano (4 dígitos) | município (7 dígitos,
+# o código IBGE completo; os códigos de 6 dígitos também cabem)
+_PESO_UF = 10 ** 11
+_PESO_ANO = 10 ** 7
+
+# Valores usados no lugar de chaves ausentes (ficam no fim da ordenação)
+_UF_AUSENTE = 99
+_ANO_AUSENTE = 9999
+_MUN_AUSENTE = 9_999_999
+
+
+class QuadroIndexado:
+    """
+    Quadro ordenado por (UF, ano, município) com o índice de fatias e,
+    opcionalmente, a impressão digital dos dados de origem (usada como
+    chave pelo cache de resultados).
+
+    Criado por ordenar_por_uf_ano_municipio. 'quadro' devolve o DataFrame
+    (cópia rasa sob copy-on-write: edições nela não chegam aqui); colunas,
+    len() e quadro_indexado["coluna"] leem direto.
+    """
+
+    def __init__(
+        self,
+        quadro: pd.DataFrame,
+        chaves: np.ndarray | None,
+        inicios: np.ndarray | None,
+        impressao: str | None = None,
+    ):
+        self._quadro = quadro
+        self._chaves = chaves
+        self._inicios = inicios
+        self.impressao = impressao
+
+    @property
+    def quadro(self) -> pd.DataFrame:
+        return self._quadro.copy(deep=False)
+
+    @property
+    def columns(self) -> pd.Index:
+        return self._quadro.columns
+
+    @property
+    def empty(self) -> bool:
+        return self._quadro.empty
+
+    @property
+    def indexado(self) -> bool:
+        return self._chaves is not None
+
+    def __len__(self) -> int:
+        return len(self._quadro)
+
+    def __getitem__(self, coluna):
+        return self.quadro[coluna]
+
+    def __repr__(self) -> str:
+        indice = f"{len(self._chaves)} grupos" if self.indexado else "sem índice"
+        return f"QuadroIndexado({len(self)} linhas, {indice})"
+
+    def _fatia(self, ini: int, fim: int) -> pd.DataFrame:
+        return self._quadro.iloc[ini:fim]
+
+    def _linhas(self, posicoes: np.ndarray) -> pd.DataFrame:
+        return self._quadro.iloc[posicoes]
+
+    def _linhas_do_intervalo(self, chave_ini: int, chave_fim: int) -> tuple[int, int]:
+        """
+        Posições [ini, fim) das linhas cujas chaves estão em [chave_ini, chave_fim).
+        """
+        g_ini, g_fim = np.searchsorted(self._chaves, [chave_ini, chave_fim])
+        return int(self._inicios[g_ini]), int(self._inicios[g_fim])
+
+
+def como_quadro(quadro: pd.DataFrame | QuadroIndexado) -> pd.DataFrame:
+    """
+    DataFrame de um QuadroIndexado (ou o próprio DataFrame), para funções
+    que não usam o índice.
+    """
+    return quadro.quadro if isinstance(quadro, QuadroIndexado) else quadro
+
+
+def _coluna_chave(quadro: pd.DataFrame, nome: str, ausente: int) -> np.ndarray | None:
+    """
+    Coluna da chave como int64, com 'ausente' no lugar dos nulos. None se
+    algum valor não for inteiro em [0, ausente) e não couber na sua faixa
+    de dígitos.
+    """
+    if nome not in quadro.columns:
+        return np.full(len(quadro), ausente, dtype=np.int64)
+    valores = quadro[nome]
+    if not pd.api.types.is_numeric_dtype(valores):
+        valores = pd.to_numeric(valores, errors="coerce")
+    valores = valores.to_numpy(dtype=np.float64, na_value=np.nan)
+    ausentes = np.isnan(valores)
+    with np.errstate(invalid="ignore"):
+        inteiros = valores.astype(np.int64)
+    presentes = ~ausentes
+    if (
+        np.any(inteiros[presentes] != valores[presentes])
+        or np.any(inteiros[presentes] < 0)
+        or np.any(inteiros[presentes] >= ausente)
+    ):
+        return None
+    inteiros[ausentes] = ausente
+    return inteiros
+
+
+def _chave_composta(quadro: pd.DataFrame) -> np.ndarray | None:
+    """
+    Combina sg_uf_not, nu_ano e id_mn_resi numa chave int64 por linha, ou
+    None se algum valor não couber nos dígitos reservados (ex.: código de
+    município com mais de 7 dígitos), o que misturaria as partes da chave.
+    """
+    partes = [
+        (_coluna_chave(quadro, "sg_uf_not", _UF_AUSENTE), _PESO_UF),
+        (_coluna_chave(quadro, "nu_ano", _ANO_AUSENTE), _PESO_ANO),
+        (_coluna_chave(quadro, "id_mn_resi", _MUN_AUSENTE), 1),
+    ]
+    if any(coluna is None for coluna, _ in partes):
+        return None
+
+    chave = np.zeros(len(quadro), dtype=np.int64)
+    for coluna, peso in partes:
+        chave += coluna * peso
+    return chave
+
+
+def ordenar_por_uf_ano_municipio(
+    quadro: pd.DataFrame,
+    impressao: str | None = None,
+) -> QuadroIndexado:
+    """
+    Ordena o quadro por (sg_uf_not, nu_ano, id_mn_resi), com índice 0..n-1,
+    e devolve um QuadroIndexado com o índice de fatias.
+
+    'impressao' é a impressão digital dos dados de origem (ver
+    cache.impressao_digital_zips); sem ela, o cache usa um hash do conteúdo.
+
+    Deve ser o último passo da limpeza: para filtrar ou editar depois, use
+    .quadro (um DataFrame comum) e ordene de novo se quiser o índice.
+    Chaves fora das faixas de dígitos deixam o quadro sem índice (as
+    seleções voltam ao filtro booleano).
+    """
+    if quadro.empty or "sg_uf_not" not in quadro.columns:
+        return QuadroIndexado(quadro.reset_index(drop=True), None, None, impressao)
+
+    chave = _chave_composta(quadro)
+    if chave is None:
+        print("Ordenar por UF/ano/município: chaves fora das faixas esperadas, quadro sem índice.")
+        return QuadroIndexado(quadro.reset_index(drop=True), None, None, impressao)
+
+    ordem = np.argsort(chave, kind="stable")
+    chave = chave[ordem]
+
+    ordenado = quadro.iloc[ordem].reset_index(drop=True)
+
+    # início de cada grupo distinto de (uf, ano, município)
+    inicio_grupo = np.flatnonzero(np.r_[True, chave[1:] != chave[:-1]])
+
+    print(f"Ordenar por UF/ano/município: {len(ordenado)} linhas, {len(inicio_grupo)} grupos indexados.")
+    return QuadroIndexado(
+        ordenado, chave[inicio_grupo], np.r_[inicio_grupo, len(ordenado)], impressao
+    )
+
+
+def selecionar(
+    quadro: pd.DataFrame | QuadroIndexado,
+    uf_cod: int | None = None,
+    nu_ano: int | None = None,
+    id_mn_resi: int | None = None,
+) -> pd.DataFrame:
+    """
+    Seleciona as linhas de uma UF, de um ano e/ou de um município.
+
+    Num QuadroIndexado, UF e (UF, ano) são uma única fatia contínua;
+    município sem ano junta as fatias de cada ano. Em DataFrames comuns
+    (ou sem UF informada) faz o filtro booleano.
+    """
+    if not (isinstance(quadro, QuadroIndexado) and quadro.indexado and uf_cod is not None):
+        quadro = como_quadro(quadro)
+        mascara = pd.Series(True, index=quadro.index)
+        if uf_cod is not None:
+            mascara &= quadro["sg_uf_not"] == uf_cod
+        if nu_ano is not None:
+            mascara &= quadro["nu_ano"] == nu_ano
+        if id_mn_resi is not None:
+            mascara &= quadro["id_mn_resi"] == id_mn_resi
+        return quadro[mascara]
+
+    base = int(uf_cod) * _PESO_UF
+
+    if nu_ano is not None:
+        base += int(nu_ano) * _PESO_ANO
+        if id_mn_resi is not None:
+            chave = base + int(id_mn_resi)
+            return quadro._fatia(*quadro._linhas_do_intervalo(chave, chave + 1))
+        return quadro._fatia(*quadro._linhas_do_intervalo(base, base + _PESO_ANO))
+
+    if id_mn_resi is None:
+        return quadro._fatia(*quadro._linhas_do_intervalo(base, base + _PESO_UF))
+
+    # município em todos os anos: um trecho por ano dentro da fatia da UF
+    chaves, inicios = quadro._chaves, quadro._inicios
+    g_ini, g_fim = np.searchsorted(chaves, [base, base + _PESO_UF])
+    grupos = np.arange(g_ini, g_fim)
+    grupos = grupos[chaves[grupos] % _PESO_ANO == int(id_mn_resi)]
+    if len(grupos) == 0:
+        return quadro._fatia(0, 0)
+    posicoes = np.concatenate([np.arange(inicios[g], inicios[g + 1]) for g in grupos])
+    return quadro._linhas(posicoes)
+
+
+def selecionar_uf(quadro: pd.DataFrame | QuadroIndexado, uf_cod: int) -> pd.DataFrame:
+    """
+    Equivalente a quadro[quadro["sg_uf_not"] == uf_cod], usando o índice de
+    fatias quando o quadro é um QuadroIndexado.
+    """
+    return selecionar(quadro, uf_cod=uf_cod)
@@ -1,10 +1,86 @@
+import os
 import pandas as pd
 import zipfile
 
-def leitor_csv_zip(caminho_zip: str, colunas: list[str]) -> pd.DataFrame:
+from algoritmos.amostragem import amostra_estratificada
+
+# Valores tratados como ausentes pelo read_csv do pandas (usados também no motor Arrow)
+VALORES_AUSENTES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+    "nan", "null",
+]
+
+
+def _ler_csv_pandas(z: zipfile.ZipFile, csv_principal: str, colunas: list[str]) -> pd.DataFrame:
+    """
+    Motor padrão: parser do pandas (uma thread) lendo o membro do zip em fluxo.
+    """
+    with z.open(csv_principal) as f:
+        return pd.read_csv(f, usecols=colunas, low_memory=False)
+
+
+def _ler_csv_arrow(z: zipfile.ZipFile, csv_principal: str, colunas: list[str]) -> pd.DataFrame:
+    """
+    Motor Arrow: parser multi-thread do pyarrow lendo o membro do zip em
+    fluxo (sem arquivo temporário) e convertendo só as colunas pedidas.
+
+    Ajustes para a saída ser igual à do motor pandas:
+    - mesmos valores ausentes e textos vazios como nulos
+    - datas que o Arrow reconhece sozinho voltam a ser texto (o pandas não
+      converte datas sem parse_dates)
+    - colunas na ordem do arquivo, como no usecols do pandas
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+
+    with z.open(csv_principal) as f:
+        cabecalho = f.readline().decode("utf-8-sig").strip().split(",")
+
+    with z.open(csv_principal) as f:
+        tabela = pacsv.read_csv(
+            f,
+            read_options=pacsv.ReadOptions(use_threads=True),
+            convert_options=pacsv.ConvertOptions(
+                include_columns=colunas,
+                null_values=VALORES_AUSENTES,
+                strings_can_be_null=True,
+            ),
+        )
+
+    for i, campo in enumerate(tabela.schema):
+        if pa.types.is_date(campo.type) or pa.types.is_timestamp(campo.type):
+            tabela = tabela.set_column(i, campo.name, pc.cast(tabela.column(i), pa.string()))
+
+    ordem = [c.strip('"') for c in cabecalho if c.strip('"') in colunas]
+    return tabela.select(ordem).to_pandas()
+
+
+MOTORES_LEITURA = {
+    "pandas": _ler_csv_pandas,
+    "arrow": _ler_csv_arrow,
+}
+
+
+def leitor_csv_zip(
+    caminho_zip: str,
+    colunas: list[str],
+    motor: str = "pandas",
+    fracao_amostra: float | None = None,
+    semente: int = 42,
+) -> pd.DataFrame:
     """
     Lê um CSV de dentro de um arquivo .zip, usando apenas as colunas necessárias.
     Supõe que haja pelo menos um .csv dentro do zip.
+
+    motor: "pandas" (padrão) ou "arrow" (multi-thread, requer pyarrow).
+    Sem pyarrow instalado, ou se o Arrow não conseguir converter o arquivo,
+    a leitura volta para o motor pandas.
+
+    fracao_amostra: se informada, devolve só uma amostra estratificada
+    (UF x ano x CLASSI_FIN) do arquivo, com os pesos amostrais; a mesma
+    semente sempre sorteia as mesmas linhas.
     """
     try:
         with zipfile.ZipFile(caminho_zip, 'r') as z:
@@ -21,11 +97,25 @@ def leitor_csv_zip(caminho_zip: str, colunas: list[str]) -> pd.DataFrame:
             csv_principal = csvs[0]
             print(f"Lendo {csv_principal} de dentro de {caminho_zip}")
 
-            with z.open(csv_principal) as f:
-                quadro = pd.read_csv(f, usecols=colunas, low_memory=False)
+            if motor not in MOTORES_LEITURA:
+                raise ValueError(f"Motor de leitura desconhecido: '{motor}'")
+
+            try:
+                quadro = MOTORES_LEITURA[motor](z, csv_principal, colunas)
+            except (ImportError, ValueError) as e:
+                if motor == "pandas":
+                    raise
+                # ArrowInvalid é subclasse de ValueError
+                print(f"Aviso: motor '{motor}' indisponível para {caminho_zip} ({e}). Usando pandas.")
+                quadro = _ler_csv_pandas(z, csv_principal, colunas)
 
         # Padroniza colunas para minúsculas, igual ao leitor de .csv solto
         quadro.columns = [c.lower() for c in quadro.columns]
+
+        if fracao_amostra is not None:
+            quadro = amostra_estratificada(
+                quadro, fracao_amostra, semente, rotulo=os.path.basename(caminho_zip)
+            )
         return quadro
 
     except Exception as e:
@@ -33,14 +123,22 @@ def leitor_csv_zip(caminho_zip: str, colunas: list[str]) -> pd.DataFrame:
         return pd.DataFrame()
 
 
-def leitor_geral_especifico_zip(caminhos_zip: list[str], colunas: list[str]) -> pd.DataFrame:
+def leitor_geral_especifico_zip(
+    caminhos_zip: list[str],
+    colunas: list[str],
+    motor: str = "pandas",
+    fracao_amostra: float | None = None,
+    semente: int = 42,
+) -> pd.DataFrame:
     """
     Lê vários .zip (cada um contendo um CSV de dengue) e concatena tudo em um único DataFrame.
+    Com 'fracao_amostra', cada arquivo é amostrado separadamente (ver leitor_csv_zip).
     """
     dados_finais = pd.DataFrame()
 
     for caminho in caminhos_zip:
-        quadro = leitor_csv_zip(caminho, colunas)
+        quadro = leitor_csv_zip(caminho, colunas, motor=motor,
+                                fracao_amostra=fracao_amostra, semente=semente)
         if not quadro.empty:
             dados_finais = pd.concat([dados_finais, quadro], ignore_index=True)
 
@@ -0,0 +1,247 @@
+import pandas as pd
+import numpy as np
+from scipy.stats import nbinom
+
+from algoritmos.tabulacao import tabulacao_cruzada
+from algoritmos.previsao import COLUNA_GRUPO, indice_semana_data, inicio_semana
+
+# -------------------------------------------------------------------
+# ATRASO DE NOTIFICAÇÃO E NOWCASTING DAS SEMANAS RECENTES
+# -------------------------------------------------------------------
+#
+# Um caso com início de sintomas na semana t só entra na base quando é
+# notificado, 'atraso' semanas depois. Na data de corte T, a semana t só
+# mostra os casos com t + atraso <= T, então as últimas semanas sempre
+# aparecem com menos casos do que terão.
+#
+# O triângulo de notificação (semana de início x atraso) de cada UF dá a
+# fração F(d) dos casos que já foi notificada d semanas depois do início
+# (método chain ladder). A contagem corrigida da semana com d semanas
+# decorridas é observado / F(d); o intervalo vem da binomial negativa dos
+# casos ainda não notificados dado o observado.
+#
+# Todas as UFs (ou municípios) são corrigidas juntas em arrays
+# (grupos x semanas x atrasos); municípios usam a distribuição de atraso
+# da sua UF, mais estável que a de cada município.
+#
+# As semanas usam o calendário epidemiológico de previsao.py (índice
+# contínuo de semanas, de domingo a sábado).
+
+
+def _atrasos_em_semanas(
+    quadro: pd.DataFrame,
+    max_atraso: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Semana de início dos sintomas, semana de notificação e atraso (semanas
+    entre as duas) de cada linha. Atrasos acima de 'max_atraso' ficam no
+    último valor; linhas sem datas ou com atraso negativo ficam com -1.
+    """
+    inicio = indice_semana_data(quadro["dt_sin_pri"])
+    notificacao = indice_semana_data(quadro["dt_notific"])
+    atraso = notificacao - inicio
+    invalido = (inicio < 0) | (notificacao < 0) | (atraso < 0)
+    atraso = np.minimum(atraso, max_atraso)
+    inicio[invalido] = -1
+    atraso[invalido] = -1
+    return inicio, notificacao, atraso
+
+
+def distribuicao_atrasos(
+    quadro: pd.DataFrame,
+    periodo: str = "ano",
+    max_atraso: int = 12,
+) -> pd.DataFrame:
+    """
+    Distribuição do atraso de notificação (DT_NOTIFIC - DT_SIN_PRI, em
+    semanas) por UF e período do início dos sintomas ("ano" ou "mes"; o
+    mês vem como AAAAMM, ex.: 202403). Atrasos acima de 'max_atraso'
+    semanas são somados no último valor.
+
+    Saída: colunas ['sg_uf_not', 'periodo', 'atraso_semanas', 'casos',
+                    'proporcao', 'acumulada']
+    """
+    if periodo not in ("ano", "mes"):
+        raise ValueError(f"Período desconhecido: '{periodo}'")
+
+    _, _, atraso = _atrasos_em_semanas(quadro, max_atraso)
+    datas_inicio = pd.to_datetime(quadro["dt_sin_pri"], errors="coerce")
+    rotulo_periodo = (
+        datas_inicio.dt.year if periodo == "ano"
+        else datas_inicio.dt.year * 100 + datas_inicio.dt.month
+    )
+
+    tab = tabulacao_cruzada({
+        "sg_uf_not": pd.to_numeric(quadro["sg_uf_not"], errors="coerce"),
+        "periodo": rotulo_periodo,
+        "atraso_semanas": pd.Series(np.where(atraso >= 0, atraso, np.nan), index=quadro.index),
+    })
+
+    # todos os atrasos 0..max_atraso para cada UF x período, mesmo os sem caso
+    atrasos = tab.eixos[2].astype(int)
+    contagem = np.zeros(tab.contagem.shape[:2] + (max_atraso + 1,), dtype=np.int64)
+    contagem[..., atrasos] = tab.contagem
+
+    total = contagem.sum(axis=-1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        proporcao = np.where(total > 0, contagem / total, 0.0)
+    acumulada = np.cumsum(proporcao, axis=-1)
+
+    ufs, periodos, passos = np.meshgrid(
+        np.arange(len(tab.eixos[0])), np.arange(len(tab.eixos[1])),
+        np.arange(max_atraso + 1), indexing="ij",
+    )
+    resultado = pd.DataFrame({
+        "sg_uf_not": tab.eixos[0].take(ufs.ravel()),
+        "periodo": tab.eixos[1].take(periodos.ravel()),
+        "atraso_semanas": passos.ravel(),
+        "casos": contagem.ravel(),
+        "proporcao": proporcao.ravel(),
+        "acumulada": acumulada.ravel(),
+    })
+    return resultado[np.repeat(total.ravel() > 0, max_atraso + 1)].reset_index(drop=True)
+
+
+def triangulo_notificacao(
+    quadro: pd.DataFrame,
+    nivel: str = "uf",
+    data_corte: str | pd.Timestamp | None = None,
+    max_atraso: int = 12,
+    janela: int = 52,
+) -> tuple[np.ndarray, pd.Index, pd.DatetimeIndex]:
+    """
+    Triângulo de notificação das últimas 'janela' semanas de início de
+    sintomas até a data de corte (padrão: maior DT_NOTIFIC da base).
+    Só entram semanas completas: se o corte cai no meio de uma semana,
+    vale o sábado anterior e as notificações posteriores são ignoradas.
+
+    Retorna:
+    - array int (grupos x semanas x atrasos 0..max_atraso) com o número de
+      casos por semana de início e atraso; células com semana + atraso
+      depois do corte ainda não foram observadas e ficam 0
+    - rótulos dos grupos (UFs ou municípios)
+    - data de início (domingo) de cada semana
+    """
+    if nivel not in COLUNA_GRUPO:
+        raise ValueError(f"Nível de agregação desconhecido: '{nivel}'")
+
+    corte = pd.Timestamp(data_corte) if data_corte is not None else pd.to_datetime(quadro["dt_notific"]).max()
+    # última semana completa (terminada até o corte)
+    semana_corte = int(indice_semana_data([corte + pd.Timedelta(days=1)])[0]) - 1
+    primeira = semana_corte - janela + 1
+
+    inicio, notificacao, atraso = _atrasos_em_semanas(quadro, max_atraso)
+    notificado = (inicio >= primeira) & (notificacao <= semana_corte) & (atraso >= 0)
+
+    grupo = pd.to_numeric(quadro[COLUNA_GRUPO[nivel]], errors="coerce")
+    tab = tabulacao_cruzada({
+        "grupo": grupo[notificado],
+        "semana": pd.Series(inicio[notificado] - primeira),
+        "atraso": pd.Series(atraso[notificado]),
+    })
+
+    triangulo = np.zeros((len(tab.eixos[0]), janela, max_atraso + 1), dtype=np.int64)
+    triangulo[
+        np.ix_(np.arange(len(tab.eixos[0])), tab.eixos[1].astype(int), tab.eixos[2].astype(int))
+    ] = tab.contagem
+
+    return triangulo, tab.eixos[0], inicio_semana(np.arange(primeira, semana_corte + 1))
+
+
+def probabilidade_notificacao(triangulo: np.ndarray) -> np.ndarray:
+    """
+    Chain ladder vetorizado: fração acumulada F(d) dos casos notificados até
+    d semanas após o início dos sintomas, para cada grupo (grupos x atrasos).
+
+    O fator de desenvolvimento de d para d+1 usa só as semanas em que o
+    atraso d+1 já foi observado. Sem casos para estimar um fator, ele vale 1.
+    Grupos sem nenhum caso notificado até d ficam com F(d) = 0 (sem
+    correção possível para essas semanas).
+    """
+    n_grupos, n_semanas, n_atrasos = triangulo.shape
+    # semanas decorridas até o corte: a última semana do triângulo tem 0
+    decorrido = np.arange(n_semanas)[::-1]
+
+    acumulado = np.cumsum(triangulo, axis=-1).astype(float)
+    fatores = np.ones((n_grupos, n_atrasos - 1))
+    for d in range(n_atrasos - 1):
+        completas = decorrido >= d + 1
+        numerador = acumulado[:, completas, d + 1].sum(axis=1)
+        denominador = acumulado[:, completas, d].sum(axis=1)
+        # todos os casos ainda por vir (nada notificado até d): F(d) = 0
+        sem_base = np.where(numerador > 0, np.inf, 1.0)
+        fatores[:, d] = np.where(denominador > 0, numerador / np.maximum(denominador, 1), sem_base)
+
+    # F(max_atraso) = 1; F(d) = F(d+1) / fator_d
+    prob = np.ones((n_grupos, n_atrasos))
+    for d in range(n_atrasos - 2, -1, -1):
+        prob[:, d] = prob[:, d + 1] / fatores[:, d]
+    return prob
+
+
+def nowcast_semanal(
+    quadro: pd.DataFrame,
+    nivel: str = "uf",
+    data_corte: str | pd.Timestamp | None = None,
+    max_atraso: int = 12,
+    janela: int = 52,
+    nivel_confianca: float = 0.95,
+) -> pd.DataFrame:
+    """
+    Corrige, para todas as UFs ou municípios de uma vez, as contagens das
+    últimas 'max_atraso' semanas de início de sintomas, que ainda estão
+    incompletas por causa do atraso de notificação.
+
+    A distribuição de atraso vem do triângulo de notificação das últimas
+    'janela' semanas de cada UF (municípios usam a UF de residência, os
+    dois primeiros dígitos de ID_MN_RESI, e, sem ela, o país inteiro).
+
+    Saída: colunas ['grupo', 'semana_inicio', 'semanas_decorridas',
+                    'casos_observados', 'prob_notificado', 'casos_estimados',
+                    'ic_inf', 'ic_sup']
+    """
+    tri_uf, ufs, semanas = triangulo_notificacao(quadro, "uf", data_corte, max_atraso, janela)
+    prob_uf = probabilidade_notificacao(tri_uf)
+    prob_pais = probabilidade_notificacao(tri_uf.sum(axis=0, keepdims=True))[0]
+
+    recentes = slice(janela - max_atraso, janela)
+    # d semanas decorridas: a última semana (atual) tem 0
+    decorrido = np.arange(max_atraso)[::-1]
+
+    if nivel == "uf":
+        grupos = ufs
+        observados = tri_uf[:, recentes, :].sum(axis=-1)
+        prob = prob_uf[:, decorrido]
+    else:
+        tri_grupo, grupos, _ = triangulo_notificacao(quadro, nivel, data_corte, max_atraso, max_atraso)
+        observados = tri_grupo.sum(axis=-1)
+
+        uf_residencia = np.asarray(grupos, dtype=float) // 10_000
+        posicao_uf = ufs.get_indexer(uf_residencia)
+        prob_grupo = np.where(
+            (posicao_uf >= 0)[:, None], prob_uf[np.maximum(posicao_uf, 0)], prob_pais[None, :]
+        )
+        prob = prob_grupo[:, decorrido]
+
+    # casos ainda não notificados ~ binomial negativa(observado + 1/2, F)
+    alfa = (1 - nivel_confianca) / 2
+    com_prob = prob > 0
+    p = np.where(com_prob, np.minimum(prob, 1.0), 1.0)
+    r = observados + 0.5
+    estimados = np.where(com_prob, observados / p, np.nan)
+    ic_inf = np.where(com_prob, observados + nbinom.ppf(alfa, r, p), np.nan)
+    ic_sup = np.where(com_prob, observados + nbinom.ppf(1 - alfa, r, p), np.nan)
+
+    n_grupos = len(grupos)
+    resultado = pd.DataFrame({
+        "grupo": np.repeat(np.asarray(grupos), max_atraso),
+        "semana_inicio": np.tile(semanas[recentes], n_grupos),
+        "semanas_decorridas": np.tile(decorrido, n_grupos),
+        "casos_observados": observados.ravel(),
+        "prob_notificado": prob.ravel(),
+        "casos_estimados": estimados.ravel(),
+        "ic_inf": ic_inf.ravel(),
+        "ic_sup": ic_sup.ravel(),
+    })
+    print(f"Nowcasting ({nivel}): {n_grupos} séries x {max_atraso} semanas recentes corrigidas.")
+    return resultado
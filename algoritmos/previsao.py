@@ -0,0 +1,374 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import numpy as np
+
+from algoritmos.tabulacao import tabulacao_cruzada
+
+# -------------------------------------------------------------------
+# PREVISÃO EM LOTE DE CASOS SEMANAIS (UFs E MUNICÍPIOS)
+# -------------------------------------------------------------------
+#
+# Todas as séries ficam numa matriz (séries x semanas) e os modelos operam
+# na matriz inteira de uma vez. O modelo mais pesado (suavização exponencial
+# sazonal com busca de parâmetros) divide as séries em blocos e distribui os
+# blocos entre processos.
+#
+# As colunas seguem o calendário epidemiológico completo (nenhuma semana
+# sem casos fica de fora) e a sazonalidade é alinhada pelo número da
+# semana, não pela posição da coluna: há anos com 53 semanas (ex.: 2020),
+# e um deslocamento fixo de 52 colunas erraria a semana a partir deles.
+
+PERIODO = 52
+
+COLUNA_GRUPO = {"uf": "sg_uf_not", "municipio": "id_mn_resi"}
+
+# Domingo, 4 de janeiro de 1970: as semanas epidemiológicas começam no domingo
+_DOMINGO_REFERENCIA = np.datetime64("1970-01-04")
+
+
+# -------------------------------------------------------------------
+# CALENDÁRIO EPIDEMIOLÓGICO
+# -------------------------------------------------------------------
+
+def _inicio_ano_epidemiologico(anos) -> np.ndarray:
+    """
+    Índice (semanas desde a referência) da semana 1 de cada ano: a semana,
+    de domingo a sábado, que contém 4 de janeiro (ao menos quatro dias no ano).
+    """
+    anos = np.asarray(anos, dtype="int64")
+    quatro_janeiro = (anos - 1970).astype("datetime64[Y]").astype("datetime64[D]") + 3
+    return np.floor_divide((quatro_janeiro - _DOMINGO_REFERENCIA).astype("int64"), 7)
+
+
+def semanas_no_ano(anos) -> np.ndarray:
+    """
+    Número de semanas epidemiológicas (52 ou 53) de cada ano.
+    """
+    anos = np.asarray(anos, dtype="int64")
+    return _inicio_ano_epidemiologico(anos + 1) - _inicio_ano_epidemiologico(anos)
+
+
+def indice_semana(codigos) -> np.ndarray:
+    """
+    Converte SEM_NOT (AAAASS, ex.: 202053) em índice contínuo de semanas,
+    em que semanas consecutivas do calendário diferem de 1.
+    """
+    codigos = np.asarray(codigos).astype("int64")
+    return _inicio_ano_epidemiologico(codigos // 100) + codigos % 100 - 1
+
+
+def codigo_semana(indices) -> np.ndarray:
+    """
+    Inverso de indice_semana: índice contínuo -> SEM_NOT (AAAASS). A semana
+    pertence ao ano da sua quarta-feira.
+    """
+    indices = np.asarray(indices, dtype="int64")
+    quarta = _DOMINGO_REFERENCIA + indices * 7 + 3
+    anos = quarta.astype("datetime64[Y]").astype("int64") + 1970
+    return anos * 100 + indices - _inicio_ano_epidemiologico(anos) + 1
+
+
+def indice_semana_data(datas) -> np.ndarray:
+    """
+    Índice contínuo (o mesmo de indice_semana) da semana epidemiológica,
+    de domingo a sábado, que contém cada data; datas ausentes viram -1.
+    """
+    valores = pd.to_datetime(pd.Series(datas), errors="coerce")
+    dias = (valores.to_numpy(dtype="datetime64[D]") - _DOMINGO_REFERENCIA).astype("int64")
+    semanas = np.floor_divide(dias, 7)
+    semanas[valores.isna().to_numpy()] = -1
+    return semanas
+
+
+def inicio_semana(indices) -> pd.DatetimeIndex:
+    """
+    Domingo de início de cada semana, a partir do índice contínuo.
+    """
+    indices = np.asarray(indices, dtype="int64")
+    return pd.DatetimeIndex(_DOMINGO_REFERENCIA + indices * 7, name="semana_inicio")
+
+
+def calendario_epidemiologico(primeira: int, ultima: int) -> pd.Index:
+    """
+    Todas as semanas epidemiológicas (SEM_NOT) de 'primeira' a 'ultima'.
+    """
+    indices = np.arange(indice_semana(primeira), indice_semana(ultima) + 1)
+    return pd.Index(codigo_semana(indices), name="sem_not")
+
+
+def _semanas_seguintes(semanas: pd.Index, horizonte: int) -> np.ndarray:
+    """
+    SEM_NOT das 'horizonte' semanas depois da última do histórico.
+    """
+    return codigo_semana(indice_semana(semanas[-1]) + 1 + np.arange(horizonte))
+
+
+def _posicoes_anos_antes(semanas: pd.Index, alvos: np.ndarray, anos) -> np.ndarray:
+    """
+    Coluna do histórico com a mesma semana epidemiológica 'anos' anos antes
+    de cada semana-alvo (a semana 53 usa a 52 nos anos que não a têm). A
+    posição pode cair fora do histórico; quem chama verifica.
+    """
+    ano = alvos // 100 - anos
+    semana = np.minimum(alvos % 100, semanas_no_ano(ano))
+    return indice_semana(ano * 100 + semana) - indice_semana(semanas[0])
+
+
+def _sazonalidade(codigos) -> np.ndarray:
+    """
+    Posição sazonal (0..PERIODO-1) pelo número da semana; a semana 53
+    divide a posição da 52.
+    """
+    return np.minimum(np.asarray(codigos, dtype="int64") % 100, PERIODO) - 1
+
+
+def matriz_series_semanais(
+    quadro: pd.DataFrame,
+    nivel: str = "uf",
+) -> tuple[np.ndarray, pd.Index, pd.Index]:
+    """
+    Monta a matriz de casos por semana epidemiológica (SEM_NOT) para cada
+    UF (nivel="uf") ou município de residência (nivel="municipio"), com uma
+    coluna para cada semana do calendário entre a primeira e a última.
+
+    Retorna:
+    - matriz float (n_series x n_semanas), semanas sem caso = 0
+    - rótulos das séries (códigos de UF ou município)
+    - rótulos das semanas (SEM_NOT, ex.: 202415), em ordem
+    """
+    if nivel not in COLUNA_GRUPO:
+        raise ValueError(f"Nível de agregação desconhecido: '{nivel}'")
+
+    tab = tabulacao_cruzada({
+        "grupo": pd.to_numeric(quadro[COLUNA_GRUPO[nivel]], errors="coerce"),
+        "sem_not": pd.to_numeric(quadro["sem_not"], errors="coerce"),
+    })
+    if not len(tab.eixos[1]):
+        return tab.contagem.astype(float), tab.eixos[0], pd.Index([], dtype="int64", name="sem_not")
+
+    # espalha as semanas observadas no calendário completo
+    posicao = indice_semana(tab.eixos[1].to_numpy())
+    primeira = posicao.min()
+    matriz = np.zeros((len(tab.eixos[0]), posicao.max() - primeira + 1))
+    np.add.at(matriz.T, posicao - primeira, tab.contagem.T)
+
+    semanas = pd.Index(codigo_semana(np.arange(primeira, posicao.max() + 1)), name="sem_not")
+    return matriz, tab.eixos[0], semanas
+
+
+# -------------------------------------------------------------------
+# MODELOS (recebem a matriz de histórico e as suas semanas, SEM_NOT, e
+# devolvem séries x horizonte)
+# -------------------------------------------------------------------
+
+def prever_ingenuo_sazonal(historico: np.ndarray, horizonte: int, semanas: pd.Index) -> np.ndarray:
+    """
+    Repete o valor da mesma semana do ano anterior (de anos mais antigos,
+    para passos além de um ano).
+    """
+    n_semanas = historico.shape[1]
+    alvos = _semanas_seguintes(semanas, horizonte)
+
+    anos = np.ones(horizonte, dtype=np.int64)
+    idx = _posicoes_anos_antes(semanas, alvos, anos)
+    while (idx >= n_semanas).any():
+        anos[idx >= n_semanas] += 1
+        idx = _posicoes_anos_antes(semanas, alvos, anos)
+    if (idx < 0).any():
+        raise ValueError("Histórico curto demais: é preciso ao menos uma temporada completa.")
+
+    return historico[:, idx]
+
+
+def prever_media_sazonal(
+    historico: np.ndarray,
+    horizonte: int,
+    semanas: pd.Index,
+    n_anos: int = 3,
+    janela: int = 4,
+) -> np.ndarray:
+    """
+    Linha de base sazonal: média da mesma semana nos 'n_anos' anteriores,
+    multiplicada pela razão entre as últimas 'janela' semanas e as mesmas
+    semanas dos anos anteriores (ajuste ao nível atual da epidemia).
+    """
+    n_semanas = historico.shape[1]
+    anos = np.arange(1, n_anos + 1)
+
+    def media_anos_anteriores(alvos: np.ndarray) -> np.ndarray:
+        # alvos: SEM_NOT das semanas-alvo; média da mesma semana j = 1..n_anos anos antes
+        idx = _posicoes_anos_antes(semanas, alvos[None, :], anos[:, None])
+        valido = (idx >= 0) & (idx < n_semanas)
+        valores = historico[:, np.clip(idx, 0, n_semanas - 1)] * valido
+        n_validos = np.maximum(valido.sum(axis=0), 1)
+        return valores.sum(axis=1) / n_validos
+
+    perfil = media_anos_anteriores(_semanas_seguintes(semanas, horizonte))
+
+    recentes = np.asarray(semanas[-janela:], dtype="int64")
+    nivel_atual = historico[:, n_semanas - janela:].sum(axis=1)
+    nivel_passado = media_anos_anteriores(recentes).sum(axis=1)
+    fator = (nivel_atual + 1.0) / (nivel_passado + 1.0)
+
+    return perfil * fator[:, None]
+
+
+def _suavizacao_sazonal_bloco(args: tuple) -> np.ndarray:
+    """
+    Suavização exponencial com nível e sazonalidade aditivos (na escala
+    log1p) para um bloco de séries, testando todas as combinações de
+    parâmetros ao mesmo tempo e ficando, em cada série, com a de menor erro
+    de previsão um passo à frente. 'posicoes' e 'posicoes_futuras' dão a
+    posição sazonal (_sazonalidade) de cada semana do histórico e do
+    horizonte.
+    """
+    historico, posicoes, posicoes_futuras, alfas, gamas = args
+    y = np.log1p(historico)
+    n_series, n_semanas = y.shape
+
+    grade_a, grade_g = np.meshgrid(alfas, gamas, indexing="ij")
+    alfa = grade_a.ravel()[None, :]
+    gama = grade_g.ravel()[None, :]
+    n_param = alfa.shape[1]
+
+    # inicialização com a primeira temporada (média por posição sazonal)
+    inicial = y[:, :PERIODO]
+    nivel = np.repeat(inicial.mean(axis=1, keepdims=True), n_param, axis=1)
+    n_por_posicao = np.bincount(posicoes[:PERIODO], minlength=PERIODO)
+    soma = np.zeros((n_series, PERIODO))
+    np.add.at(soma.T, posicoes[:PERIODO], (inicial - nivel[:, :1]).T)
+    sazonal = np.repeat((soma / np.maximum(n_por_posicao, 1))[:, :, None], n_param, axis=2)
+    erro_quadratico = np.zeros((n_series, n_param))
+
+    for t in range(PERIODO, n_semanas):
+        s = posicoes[t]
+        obs = y[:, t:t + 1]
+        previsto = nivel + sazonal[:, s, :]
+        erro_quadratico += (obs - previsto) ** 2
+        novo_nivel = alfa * (obs - sazonal[:, s, :]) + (1 - alfa) * nivel
+        sazonal[:, s, :] = gama * (obs - novo_nivel) + (1 - gama) * sazonal[:, s, :]
+        nivel = novo_nivel
+
+    melhor = erro_quadratico.argmin(axis=1)
+    linhas = np.arange(n_series)
+    previsao = (
+        nivel[linhas, melhor][:, None]
+        + sazonal[linhas[:, None], posicoes_futuras[None, :], melhor[:, None]]
+    )
+
+    return np.clip(np.expm1(previsao), 0, None)
+
+
+def prever_suavizacao_sazonal(
+    historico: np.ndarray,
+    horizonte: int,
+    semanas: pd.Index,
+    alfas: tuple = (0.1, 0.3, 0.5, 0.8),
+    gamas: tuple = (0.05, 0.2, 0.5),
+    n_processos: int | None = None,
+    tamanho_bloco: int = 500,
+) -> np.ndarray:
+    """
+    Suavização exponencial sazonal com parâmetros escolhidos por série.
+    As séries são divididas em blocos e os blocos distribuídos entre
+    'n_processos' processos (padrão: número de CPUs).
+    """
+    if historico.shape[1] <= PERIODO:
+        raise ValueError("Histórico curto demais: é preciso mais de uma temporada completa.")
+
+    posicoes = _sazonalidade(semanas)
+    posicoes_futuras = _sazonalidade(_semanas_seguintes(semanas, horizonte))
+    blocos = [
+        (historico[i:i + tamanho_bloco], posicoes, posicoes_futuras, np.array(alfas), np.array(gamas))
+        for i in range(0, historico.shape[0], tamanho_bloco)
+    ]
+
+    if n_processos == 1 or len(blocos) == 1:
+        resultados = [_suavizacao_sazonal_bloco(b) for b in blocos]
+    else:
+        with ProcessPoolExecutor(max_workers=n_processos or os.cpu_count()) as executor:
+            resultados = list(executor.map(_suavizacao_sazonal_bloco, blocos))
+
+    return np.vstack(resultados)
+
+
+MODELOS = {
+    "ingenuo_sazonal": prever_ingenuo_sazonal,
+    "media_sazonal": prever_media_sazonal,
+    "suavizacao_sazonal": prever_suavizacao_sazonal,
+}
+
+
+def _modelo(nome: str):
+    if nome not in MODELOS:
+        raise ValueError(f"Modelo de previsão desconhecido: '{nome}'. Opções: {list(MODELOS)}")
+    return MODELOS[nome]
+
+
+# -------------------------------------------------------------------
+# PREVISÃO E BACKTEST
+# -------------------------------------------------------------------
+
+def prever_casos_semanais(
+    quadro: pd.DataFrame,
+    nivel: str = "uf",
+    horizonte: int = 8,
+    modelo: str = "media_sazonal",
+    **parametros,
+) -> pd.DataFrame:
+    """
+    Prevê os casos das próximas 'horizonte' semanas para todas as séries
+    do nível escolhido (todas as UFs ou todos os municípios).
+
+    Saída: colunas ['grupo', 'passo', 'sem_not', 'previsao'], passo =
+    1..horizonte semanas depois da última SEM_NOT dos dados.
+    """
+    matriz, grupos, semanas = matriz_series_semanais(quadro, nivel)
+    previsao = _modelo(modelo)(matriz, horizonte, semanas, **parametros)
+
+    print(f"Previsão ({modelo}): {len(grupos)} séries, {horizonte} semanas após {semanas[-1]}.")
+    return pd.DataFrame({
+        "grupo": np.repeat(np.asarray(grupos), horizonte),
+        "passo": np.tile(np.arange(1, horizonte + 1), len(grupos)),
+        "sem_not": np.tile(_semanas_seguintes(semanas, horizonte), len(grupos)),
+        "previsao": previsao.ravel(),
+    })
+
+
+def backtest_previsao(
+    quadro: pd.DataFrame,
+    nivel: str = "uf",
+    horizonte: int = 8,
+    modelos: list[str] | None = None,
+    historico_minimo: int = 2 * PERIODO,
+    intervalo_origens: int = 13,
+) -> pd.DataFrame:
+    """
+    Avalia os modelos em origens móveis ao longo de todo o período dos dados
+    (2020–2025): a cada 'intervalo_origens' semanas, ajusta com o histórico
+    até a origem e compara a previsão com as semanas seguintes.
+
+    Saída: uma linha por modelo e origem, com MAE, RMSE e WAPE somados sobre
+    todas as séries.
+    """
+    matriz, _, semanas = matriz_series_semanais(quadro, nivel)
+    modelos = modelos or list(MODELOS)
+    n_semanas = matriz.shape[1]
+
+    linhas = []
+    for origem in range(historico_minimo, n_semanas - horizonte + 1, intervalo_origens):
+        real = matriz[:, origem:origem + horizonte]
+        for nome in modelos:
+            previsto = _modelo(nome)(matriz[:, :origem], horizonte, semanas[:origem])
+            erro = previsto - real
+            linhas.append({
+                "modelo": nome,
+                "origem": semanas[origem],
+                "mae": np.abs(erro).mean(),
+                "rmse": np.sqrt((erro ** 2).mean()),
+                "wape": np.abs(erro).sum() / max(real.sum(), 1.0),
+            })
+
+    return pd.DataFrame(linhas)
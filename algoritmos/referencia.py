@@ -0,0 +1,269 @@
+import pandas as pd
+import numpy as np
+from scipy.stats import iqr
+
+from algoritmos.estatisticas import faixa_etaria
+
+# -------------------------------------------------------------------
+# IMPLEMENTAÇÕES DE REFERÊNCIA (PANDAS ORIGINAL)
+# -------------------------------------------------------------------
+#
+# Cópia congelada das funções de algoritmos/estatisticas.py antes das
+# otimizações (fatias do índice, tabulação cruzada, cache, cubos).
+# Servem de saída de referência para equivalencia_motores.py: não devem
+# ser otimizadas nem alteradas junto com estatisticas.py.
+#
+# Única mudança: perfil_por_ano recebe 'uf_cod' (antes fixo em 35), como
+# a versão atual.
+
+def contagem_semanal_uf(quadro: pd.DataFrame, uf_cod: int = 35) -> pd.DataFrame:
+    """
+    Referência de estatisticas.contagem_semanal_uf.
+    Saída: colunas ['nu_ano', 'semana_ep', 'casos']
+    """
+    df = quadro.copy()
+
+    # Filtrar UF
+    df = df[df["sg_uf_not"] == uf_cod]
+
+    # Garantir que sem_not é numérico e não nulo
+    df = df[df["sem_not"].notna()]
+    df["sem_not"] = pd.to_numeric(df["sem_not"], errors="coerce")
+    df = df[df["sem_not"].notna()]
+
+    # Extrair semana epidemiológica (últimos 2 dígitos, ex: 202415 -> 15)
+    df["semana_ep"] = (df["sem_not"] % 100).astype(int)
+
+    semana = (
+        df.groupby(["nu_ano", "semana_ep"], as_index=False)
+          .size()
+          .rename(columns={"size": "casos"})
+    )
+
+    return semana
+
+
+def resumo_temporal_por_ano(semana_df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Referência de estatisticas.resumo_temporal_por_ano.
+    Retorna (resumo por ano, semanas outliers por ano).
+    """
+    if semana_df.empty:
+        return pd.DataFrame(), pd.DataFrame()
+
+    def _estatisticas(g: pd.DataFrame) -> pd.Series:
+        serie = g["casos"]
+        media = serie.mean()
+        mediana = serie.median()
+        moda = serie.mode().tolist()
+        desvio = serie.std()
+        iqr_val = iqr(serie, nan_policy="omit")
+        return pd.Series({
+            "media": media,
+            "mediana": mediana,
+            "moda": moda[0] if len(moda) > 0 else None,
+            "desvio_padrao": desvio,
+            "iqr": iqr_val,
+        })
+
+    resumo = (
+        semana_df
+        .groupby("nu_ano")
+        .apply(_estatisticas)
+        .reset_index()
+    )
+
+    # Calcular outliers por ano
+    lista_outliers = []
+    for ano, g in semana_df.groupby("nu_ano"):
+        serie = g["casos"]
+        q1, q3 = serie.quantile([0.25, 0.75])
+        lim_inf = q1 - 1.5 * (q3 - q1)
+        lim_sup = q3 + 1.5 * (q3 - q1)
+        out = g[(g["casos"] < lim_inf) | (g["casos"] > lim_sup)].copy()
+        out["nu_ano"] = ano
+        lista_outliers.append(out)
+
+    outliers = (
+        pd.concat(lista_outliers, ignore_index=True)
+        if lista_outliers else pd.DataFrame()
+    )
+
+    return resumo, outliers
+
+
+def tabela_gravidade_por_ano_uf(quadro: pd.DataFrame, uf_cod: int = 35) -> pd.DataFrame:
+    """
+    Referência de estatisticas.tabela_gravidade_por_ano_uf.
+    Saída: colunas ['nu_ano', 'dengue', 'sinal_alarme', 'grave', 'outros',
+                    'total', 'prop_grave']
+    """
+    df = quadro.copy()
+
+    # Filtrar UF
+    df = df[df["sg_uf_not"] == uf_cod]
+
+    # Garantir numérico
+    df["classi_fin"] = pd.to_numeric(df["classi_fin"], errors="coerce")
+
+    # Contagem por ano e classificação
+    contagem = (
+        df.groupby(["nu_ano", "classi_fin"], as_index=False)
+          .size()
+          .rename(columns={"size": "casos"})
+    )
+
+    # Pivotar para colunas por tipo
+    tabela = contagem.pivot(index="nu_ano", columns="classi_fin", values="casos").fillna(0)
+
+    tabela.reset_index(inplace=True)
+
+    # Renomear colunas conforme o código
+    tabela_final = pd.DataFrame({
+        "nu_ano": tabela["nu_ano"],
+        "dengue": tabela.get(10.0, 0),
+        "sinal_alarme": tabela.get(11.0, 0),
+        "grave": tabela.get(12.0, 0),
+        "outros": tabela.get(8.0, 0),
+    })
+
+    tabela_final["total"] = (
+        tabela_final["dengue"]
+        + tabela_final["sinal_alarme"]
+        + tabela_final["grave"]
+        + tabela_final["outros"]
+    )
+
+    # Proporção de casos graves
+    tabela_final["prop_grave"] = np.where(
+        tabela_final["total"] > 0,
+        tabela_final["grave"] / tabela_final["total"],
+        0.0
+    )
+
+    # Ordenar por ano
+    tabela_final = tabela_final.sort_values("nu_ano").reset_index(drop=True)
+
+    return tabela_final
+
+
+def perfil_por_ano(quadro: pd.DataFrame, uf_cod: int = 35) -> pd.DataFrame:
+    """
+    Referência de estatisticas.perfil_por_ano.
+    """
+    df = quadro[quadro['sg_uf_not'] == uf_cod].copy()
+
+    # Criação da coluna 'faixa_etaria' a partir de 'NU_IDADE_N'
+    df['faixa_etaria'] = df['nu_idade_n'].apply(faixa_etaria)
+
+    # Filtrando apenas os casos graves
+    casos_graves = df[df['classi_fin'] == 12]
+
+    # Contagem por ano, faixa etária e sexo
+    perfil_geral_ano = df.groupby(['nu_ano', 'faixa_etaria', 'cs_sexo']).size().reset_index(name='total')
+    perfil_graves_ano = casos_graves.groupby(['nu_ano', 'faixa_etaria', 'cs_sexo']).size().reset_index(name='total_graves')
+
+    # Merge para ter o perfil geral e o de casos graves na mesma tabela
+    perfil_ano = pd.merge(perfil_geral_ano, perfil_graves_ano, on=['nu_ano', 'faixa_etaria', 'cs_sexo'], how='left')
+    perfil_ano['proporcao_graves'] = perfil_ano['total_graves'] / perfil_ano['total']
+
+    return perfil_ano
+
+
+def casos_por_municipio_sp(
+    quadro: pd.DataFrame,
+    mapa_mun_sp: pd.DataFrame,
+    uf_cod: int = 35,
+    top_n: int = 20,
+) -> pd.DataFrame:
+    """
+    Referência de estatisticas.casos_por_municipio_sp.
+    """
+    df = quadro.copy()
+
+    # filtra SP
+    df_sp = df[df["sg_uf_not"] == uf_cod].copy()
+
+    # padroniza ID_MN_RESI como string de 6 dígitos
+    df_sp["id_mn_resi_6"] = (
+        df_sp["id_mn_resi"]
+        .astype("Int64")
+        .astype(str)
+        .str.zfill(6)
+    )
+
+    contagem = (
+        df_sp.groupby("id_mn_resi_6")
+        .size()
+        .reset_index(name="casos")
+    )
+
+    # junta com o mapa de municípios
+    tabela = contagem.merge(mapa_mun_sp, on="id_mn_resi_6", how="left")
+
+    # se algum código não casar, usa o código como fallback
+    tabela["municipio_nome"] = tabela["municipio_nome"].fillna(tabela["id_mn_resi_6"])
+
+    tabela = (
+        tabela.sort_values("casos", ascending=False)
+        .head(top_n)
+        .reset_index(drop=True)
+    )
+
+    # ordena colunas de forma amigável
+    tabela = tabela[["id_mn_resi_6", "municipio_nome", "casos"]]
+
+    return tabela
+
+
+def casos_graves_por_municipio_sp(
+    quadro: pd.DataFrame,
+    mapa_mun_sp: pd.DataFrame,
+    uf_cod: int = 35,
+    top_n: int = 20,
+) -> pd.DataFrame:
+    """
+    Referência de estatisticas.casos_graves_por_municipio_sp.
+    """
+    df = quadro.copy()
+
+    df_sp = df[df["sg_uf_not"] == uf_cod].copy()
+
+    df_sp["id_mn_resi_6"] = (
+        df_sp["id_mn_resi"]
+        .astype("Int64")
+        .astype(str)
+        .str.zfill(6)
+    )
+
+    total = (
+        df_sp.groupby("id_mn_resi_6")
+        .size()
+        .reset_index(name="total_casos")
+    )
+
+    graves = df_sp[df_sp["classi_fin"] == 12]
+    total_graves = (
+        graves.groupby("id_mn_resi_6")
+        .size()
+        .reset_index(name="total_graves")
+    )
+
+    tabela = total.merge(total_graves, on="id_mn_resi_6", how="left")
+    tabela["total_graves"] = tabela["total_graves"].fillna(0).astype(int)
+    tabela["proporcao_graves"] = tabela["total_graves"] / tabela["total_casos"]
+
+    tabela = tabela.merge(mapa_mun_sp, on="id_mn_resi_6", how="left")
+    tabela["municipio_nome"] = tabela["municipio_nome"].fillna(tabela["id_mn_resi_6"])
+
+    tabela = (
+        tabela.sort_values("total_graves", ascending=False)
+        .head(top_n)
+        .reset_index(drop=True)
+    )
+
+    tabela = tabela[
+        ["id_mn_resi_6", "municipio_nome", "total_casos", "total_graves", "proporcao_graves"]
+    ]
+
+    return tabela
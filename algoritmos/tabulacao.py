@@ -0,0 +1,101 @@
+from typing import NamedTuple
+
+import pandas as pd
+import numpy as np
+
+# -------------------------------------------------------------------
+# TABULAÇÃO CRUZADA POR CÓDIGOS INTEIROS (np.bincount)
+# -------------------------------------------------------------------
+
+
+class TabelaCruzada(NamedTuple):
+    """
+    Resultado de tabulacao_cruzada:
+    - dimensoes: nomes das dimensões, na ordem dos eixos
+    - eixos: rótulos de cada eixo (valores distintos, ordenados)
+    - contagem: array N-dimensional com o total de linhas por combinação
+    - contagem_condicional: mesmo formato, contando só as linhas em que a
+      condição é verdadeira (ou None se não houve condição)
+    """
+    dimensoes: list[str]
+    eixos: list[pd.Index]
+    contagem: np.ndarray
+    contagem_condicional: np.ndarray | None
+
+
+def tabulacao_cruzada(
+    colunas: dict[str, pd.Series],
+    condicao: pd.Series | np.ndarray | None = None,
+    pesos: pd.Series | np.ndarray | None = None,
+) -> TabelaCruzada:
+    """
+    Conta as linhas por combinação das colunas informadas.
+
+    Cada dimensão é fatorada uma única vez em códigos inteiros pequenos; os
+    códigos são combinados num índice linear e tudo é contado em uma só
+    passada de np.bincount. Com 'condicao', o bit da condição entra como
+    último eixo do índice, então totais e contagens condicionais (por
+    exemplo, casos graves) saem da mesma passada.
+
+    Linhas com valor ausente em qualquer dimensão são ignoradas, como no
+    groupby do pandas. 'pesos' permite somar pesos em vez de contar linhas;
+    pesos inteiros (frequências) mantêm as contagens inteiras.
+    """
+    dimensoes = list(colunas.keys())
+
+    codigos = []
+    eixos = []
+    for nome in dimensoes:
+        cod, rotulos = pd.factorize(pd.Series(colunas[nome]), sort=True)
+        codigos.append(cod)
+        eixos.append(pd.Index(rotulos, name=nome))
+
+    forma = tuple(len(e) for e in eixos)
+
+    validos = np.ones(len(codigos[0]) if codigos else 0, dtype=bool)
+    for cod in codigos:
+        validos &= cod >= 0
+
+    indice = np.ravel_multi_index([cod[validos] for cod in codigos], forma) if forma else None
+    w = None if pesos is None else np.asarray(pesos, dtype=float)[validos]
+    inteiro = pesos is None or np.issubdtype(np.asarray(pesos).dtype, np.integer)
+    n_celulas = int(np.prod(forma))
+
+    if condicao is None:
+        contagem = np.bincount(indice, weights=w, minlength=n_celulas).reshape(forma)
+        if inteiro:
+            contagem = contagem.astype(np.int64)
+        return TabelaCruzada(dimensoes, eixos, contagem, None)
+
+    bit = np.asarray(condicao, dtype=bool)[validos]
+    contagem_dupla = np.bincount(
+        indice * 2 + bit, weights=w, minlength=2 * n_celulas
+    ).reshape(forma + (2,))
+    if inteiro:
+        contagem_dupla = contagem_dupla.astype(np.int64)
+
+    contagem = contagem_dupla.sum(axis=-1)
+    contagem_condicional = contagem_dupla[..., 1]
+    return TabelaCruzada(dimensoes, eixos, contagem, contagem_condicional)
+
+
+def tabela_cruzada_para_quadro(
+    tabela: TabelaCruzada,
+    nome_contagem: str = "total",
+    nome_condicional: str = "total_condicional",
+) -> pd.DataFrame:
+    """
+    Converte a tabela para formato longo, uma linha por combinação com
+    contagem > 0, ordenada pelas dimensões (mesma saída de um groupby().size()).
+    """
+    posicoes = np.nonzero(tabela.contagem)
+
+    dados = {
+        nome: eixo.take(pos)
+        for nome, eixo, pos in zip(tabela.dimensoes, tabela.eixos, posicoes)
+    }
+    dados[nome_contagem] = tabela.contagem[posicoes]
+    if tabela.contagem_condicional is not None:
+        dados[nome_condicional] = tabela.contagem_condicional[posicoes]
+
+    return pd.DataFrame(dados)
@@ -0,0 +1,261 @@
+import os
+
+import pandas as pd
+import numpy as np
+
+from algoritmos.filtragem import UF_IBGE
+
+# -------------------------------------------------------------------
+# REGRAS DE VALIDAÇÃO (dicionário de dados SINAN – docs/dic_dados_dengue.pdf)
+# -------------------------------------------------------------------
+
+# Códigos aceitos segundo o dicionário de dados
+CODIGOS_SEXO = ["M", "F", "I"]
+CODIGOS_CLASSI_FIN = [5, 8, 10, 11, 12, 13]
+
+ANO_MINIMO = 2000
+SEMANA_MAXIMA = 53
+
+# Cada regra ocupa um bit da máscara de falhas: (código do motivo, descrição)
+REGRAS = [
+    ("UF_INVALIDA", "SG_UF_NOT ausente ou fora da tabela de UFs do IBGE"),
+    ("ANO_INVALIDO", "NU_ANO ausente ou fora do intervalo esperado"),
+    ("SEM_NOT_INVALIDA", "SEM_NOT preenchida com semana fora de 1-53"),
+    ("SEM_NOT_DIVERGE_ANO", "Ano de SEM_NOT não corresponde a NU_ANO"),
+    ("DT_NOTIFIC_INVALIDA", "DT_NOTIFIC ausente ou não reconhecida como data"),
+    ("DT_SIN_PRI_INVALIDA", "DT_SIN_PRI preenchida e não reconhecida como data"),
+    ("DT_SIN_PRI_APOS_NOTIFIC", "DT_SIN_PRI posterior a DT_NOTIFIC"),
+    ("IDADE_INVALIDA", "NU_IDADE_N preenchida fora da codificação de idade"),
+    ("SEXO_INVALIDO", "CS_SEXO preenchido com valor diferente de M, F ou I"),
+    ("CLASSI_FIN_INVALIDA", "CLASSI_FIN preenchida com código inexistente"),
+    ("MUNICIPIO_INVALIDO", "ID_MN_RESI preenchido com código que não é de município"),
+]
+
+BIT_REGRA = {codigo: bit for bit, (codigo, _) in enumerate(REGRAS)}
+
+# Campos opcionais: ausentes não reprovam a linha (cada análise ignora os
+# nulos dos campos que usa), só entram na contagem de ausentes da regra
+REGRA_CAMPO_OPCIONAL = {
+    "SEM_NOT_INVALIDA": "sem_not",
+    "DT_SIN_PRI_INVALIDA": "dt_sin_pri",
+    "IDADE_INVALIDA": "nu_idade_n",
+    "SEXO_INVALIDO": "cs_sexo",
+    "CLASSI_FIN_INVALIDA": "classi_fin",
+    "MUNICIPIO_INVALIDO": "id_mn_resi",
+}
+
+# Colunas numéricas que viram int64 depois da validação, quando não têm nulos
+COLUNAS_INTEIRAS = ["sg_uf_not", "nu_ano", "sem_not", "nu_idade_n"]
+
+
+def _tabela_codigos(codigos) -> np.ndarray:
+    """Tabela booleana indexada pelo código: tabela[c] é True se c é aceito."""
+    tabela = np.zeros(max(codigos) + 1, dtype=bool)
+    tabela[list(codigos)] = True
+    return tabela
+
+
+# Tabelas de consulta para os códigos numéricos (no lugar de isin, que em
+# colunas float ordena e compara os valores: ~1 s por regra em 3M linhas)
+_TABELA_UF = _tabela_codigos(UF_IBGE.values())
+_TABELA_CLASSI_FIN = _tabela_codigos(CODIGOS_CLASSI_FIN)
+
+
+def _codigo_aceito(valores: pd.Series, tabela: np.ndarray) -> np.ndarray:
+    """
+    Equivale a valores.isin(códigos da tabela) para colunas numéricas: só
+    valores inteiros dentro dos limites da tabela são consultados; nulos,
+    fracionários e fora da faixa ficam False.
+    """
+    v = valores.to_numpy(dtype=np.float64, na_value=np.nan)
+    consultar = (v >= 0) & (v < len(tabela))
+    consultar[consultar] = v[consultar] == np.floor(v[consultar])
+    aceito = np.zeros(len(v), dtype=bool)
+    aceito[consultar] = tabela[v[consultar].astype(np.int64)]
+    return aceito
+
+
+def _idade_valida(idade: pd.Series) -> pd.Series:
+    """
+    NU_IDADE_N aparece tanto em anos (0-150) quanto na codificação do SINAN,
+    em que o primeiro dígito é a unidade (1 = hora, 2 = dia, 3 = mês, 4 = ano)
+    e os três seguintes o valor. Aceita as duas formas.
+    """
+    unidade = idade // 1000
+    valor = idade % 1000
+    em_anos = idade.between(0, 150)
+    codificada = (
+        ((unidade == 1) & valor.between(0, 24))
+        | ((unidade == 2) & valor.between(0, 30))
+        | ((unidade == 3) & valor.between(0, 11))
+        | ((unidade == 4) & valor.between(0, 150))
+    )
+    return em_anos | codificada
+
+
+def _avaliar_regras(quadro: pd.DataFrame) -> tuple[np.ndarray, np.ndarray, dict[str, pd.Series]]:
+    """
+    Converte as colunas uma única vez e avalia todas as regras de forma
+    vetorizada, acumulando as falhas numa máscara de bits (uint32) por linha.
+    Os campos opcionais (REGRA_CAMPO_OPCIONAL) só falham quando preenchidos
+    com valor inválido; quando vazios, marcam o bit da regra numa segunda
+    máscara, de ausentes, que não reprova a linha.
+
+    Retorna a máscara de falhas, a de ausentes e as colunas já convertidas.
+    """
+    n = len(quadro)
+    mascara = np.zeros(n, dtype=np.uint32)
+    ausentes = np.zeros(n, dtype=np.uint32)
+    convertidas: dict[str, pd.Series] = {}
+
+    def falha(codigo: str, linhas: pd.Series | np.ndarray):
+        if isinstance(linhas, pd.Series):
+            linhas = linhas.to_numpy(dtype=bool, na_value=True)
+        mascara[linhas] |= np.uint32(1 << BIT_REGRA[codigo])
+
+    for codigo, col in REGRA_CAMPO_OPCIONAL.items():
+        if col in quadro.columns:
+            ausentes[quadro[col].isna().to_numpy()] |= np.uint32(1 << BIT_REGRA[codigo])
+
+    for col in ("sg_uf_not", "nu_ano", "sem_not", "nu_idade_n", "classi_fin", "id_mn_resi"):
+        if col in quadro.columns:
+            convertidas[col] = pd.to_numeric(quadro[col], errors="coerce")
+    for col in ("dt_notific", "dt_sin_pri"):
+        if col in quadro.columns:
+            convertidas[col] = pd.to_datetime(quadro[col], errors="coerce")
+
+    if "sg_uf_not" in convertidas:
+        falha("UF_INVALIDA", ~_codigo_aceito(convertidas["sg_uf_not"], _TABELA_UF))
+
+    if "nu_ano" in convertidas:
+        ano = convertidas["nu_ano"]
+        ano_maximo = pd.Timestamp.today().year + 1
+        falha("ANO_INVALIDO", ~ano.between(ANO_MINIMO, ano_maximo))
+
+    if "sem_not" in convertidas:
+        sem = convertidas["sem_not"]
+        semana = sem % 100
+        falha("SEM_NOT_INVALIDA", quadro["sem_not"].notna() & ~semana.between(1, SEMANA_MAXIMA))
+
+        if "nu_ano" in convertidas:
+            # a semana epidemiológica pode pertencer ao ano vizinho na virada do ano
+            ano_sem = sem // 100
+            ano = convertidas["nu_ano"]
+            coerente = (
+                (ano_sem == ano)
+                | ((ano_sem == ano - 1) & (semana >= 52))
+                | ((ano_sem == ano + 1) & (semana == 1))
+            )
+            falha("SEM_NOT_DIVERGE_ANO", sem.notna() & ano.notna() & ~coerente)
+
+    if "dt_notific" in convertidas:
+        falha("DT_NOTIFIC_INVALIDA", convertidas["dt_notific"].isna())
+
+    if "dt_sin_pri" in convertidas:
+        falha("DT_SIN_PRI_INVALIDA", quadro["dt_sin_pri"].notna() & convertidas["dt_sin_pri"].isna())
+
+        if "dt_notific" in convertidas:
+            falha("DT_SIN_PRI_APOS_NOTIFIC", convertidas["dt_sin_pri"] > convertidas["dt_notific"])
+
+    if "nu_idade_n" in convertidas:
+        falha("IDADE_INVALIDA", quadro["nu_idade_n"].notna() & ~_idade_valida(convertidas["nu_idade_n"]))
+
+    if "cs_sexo" in quadro.columns:
+        falha("SEXO_INVALIDO", quadro["cs_sexo"].notna() & ~quadro["cs_sexo"].isin(CODIGOS_SEXO))
+
+    if "classi_fin" in convertidas:
+        classi = convertidas["classi_fin"]
+        # CLASSI_FIN vazia é permitida (caso em investigação), mas texto inválido não
+        preenchida = quadro["classi_fin"].notna()
+        falha("CLASSI_FIN_INVALIDA", preenchida & ~_codigo_aceito(classi, _TABELA_CLASSI_FIN))
+
+    if "id_mn_resi" in convertidas:
+        mun = convertidas["id_mn_resi"]
+        preenchido = quadro["id_mn_resi"].notna()
+        municipio_ok = mun.between(110000, 539999) & _codigo_aceito(mun // 10000, _TABELA_UF)
+        falha("MUNICIPIO_INVALIDO", preenchido & ~municipio_ok)
+
+    return mascara, ausentes, convertidas
+
+
+def _motivos_por_mascara(mascara: np.ndarray) -> np.ndarray:
+    """
+    Traduz cada máscara de bits para a lista de códigos de motivo
+    ('UF_INVALIDA;SEXO_INVALIDO'). Só as combinações distintas são
+    traduzidas, o que mantém a operação vetorizada.
+    """
+    unicas, inverso = np.unique(mascara, return_inverse=True)
+    textos = np.array([
+        ";".join(codigo for bit, (codigo, _) in enumerate(REGRAS) if m & (1 << bit))
+        for m in unicas
+    ], dtype=object)
+    return textos[inverso]
+
+
+def contagem_por_regra(mascara: np.ndarray, ausentes: np.ndarray | None = None) -> pd.DataFrame:
+    """
+    Número de linhas que falharam em cada regra (uma linha pode falhar em
+    várias) e, para os campos opcionais, o número de linhas com o campo
+    vazio (mantidas, não vão para a quarentena).
+    Saída: colunas ['regra', 'descricao', 'linhas', 'ausentes']
+    """
+    if ausentes is None:
+        ausentes = np.zeros_like(mascara)
+
+    def contar(m: np.ndarray) -> list[int]:
+        return [int(np.count_nonzero(m & np.uint32(1 << bit))) for bit in range(len(REGRAS))]
+
+    return pd.DataFrame({
+        "regra": [codigo for codigo, _ in REGRAS],
+        "descricao": [descricao for _, descricao in REGRAS],
+        "linhas": contar(mascara),
+        "ausentes": contar(ausentes),
+    })
+
+
+def validar_dados(
+    quadro: pd.DataFrame,
+    caminho_quarentena: str | None = "resultados/quarentena.csv",
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Valida códigos, faixas e regras entre campos numa única passada vetorizada.
+
+    As linhas reprovadas não são corrigidas silenciosamente: vão para o
+    arquivo de quarentena (valores originais + coluna 'motivos' com os
+    códigos das regras violadas). As linhas aprovadas voltam com as colunas
+    numéricas e de datas já convertidas.
+
+    SG_UF_NOT, NU_ANO e DT_NOTIFIC são obrigatórios. Os demais campos podem
+    estar vazios: a linha é mantida e o campo só é contado como ausente.
+
+    Retorna:
+    - DataFrame com as linhas válidas
+    - contagem de falhas e de ausentes por regra
+    """
+    if quadro.empty:
+        return quadro, contagem_por_regra(np.zeros(0, dtype=np.uint32))
+
+    mascara, ausentes, convertidas = _avaliar_regras(quadro)
+    reprovada = mascara != 0
+
+    if reprovada.any() and caminho_quarentena:
+        quarentena = quadro[reprovada].copy()
+        quarentena["motivos"] = _motivos_por_mascara(mascara[reprovada])
+        pasta = os.path.dirname(caminho_quarentena)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        quarentena.to_csv(caminho_quarentena, index=False, encoding="utf-8")
+        print(f"Quarentena: {len(quarentena)} linhas gravadas em {caminho_quarentena}")
+
+    validos = quadro[~reprovada].copy()
+    for col, serie in convertidas.items():
+        serie = serie[~reprovada]
+        if col in COLUNAS_INTEIRAS and serie.notna().all():
+            serie = serie.astype("int64")
+        validos[col] = serie
+
+    contagem = contagem_por_regra(mascara, ausentes)
+
+    print(f"Validar dados: {len(quadro)} -> {len(validos)} linhas "
+          f"({int(reprovada.sum())} enviadas para quarentena).")
+    return validos, contagem
@@ -0,0 +1,231 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import numpy as np
+
+from algoritmos.previsao import matriz_series_semanais
+
+# -------------------------------------------------------------------
+# VARREDURA TEMPORAL RETROSPECTIVA (ESTATÍSTICA DE KULLDORFF, POISSON)
+# -------------------------------------------------------------------
+#
+# Para cada município, procura a janela de semanas consecutivas com maior
+# excesso de casos em relação ao esperado (razão de verossimilhança de
+# Poisson). A significância vem de simulações de Monte Carlo: os casos do
+# município são redistribuídos entre as semanas segundo a linha de base
+# (multinomial) e a razão máxima é recalculada em cada réplica. As réplicas
+# de um município são avaliadas juntas, em arrays, e os municípios são
+# distribuídos entre processos.
+
+
+def _varrer_janelas(
+    contagens: np.ndarray,
+    total: int,
+    prob_acumulada: np.ndarray,
+    janela_minima: int,
+    janela_maxima: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Avalia todas as janelas de janela_minima..janela_maxima semanas.
+    'contagens' tem formato (..., n_semanas): a última dimensão é o tempo e
+    as demais (réplicas de Monte Carlo) são processadas juntas. Todas as
+    séries têm o mesmo total de casos, então os esperados de cada janela
+    são comuns a todas as réplicas.
+
+    A razão de verossimilhança de Poisson de uma janela com c casos e E
+    esperados (c > E; as demais valem 0) é
+        c log(c/E) + (N-c) log((N-c)/(N-E))
+    e os termos k log k vêm de uma tabela indexada pelos inteiros 0..N.
+
+    Retorna, para cada série, a maior razão e o início/comprimento da janela.
+    """
+    k = np.arange(total + 1, dtype=float)
+    klogk = k * np.log(np.maximum(k, 1))
+
+    acumulado = np.zeros(contagens.shape[:-1] + (contagens.shape[-1] + 1,), dtype=np.int64)
+    np.cumsum(contagens, axis=-1, out=acumulado[..., 1:])
+
+    melhor = np.zeros(contagens.shape[:-1])
+    melhor_ini = np.zeros(contagens.shape[:-1], dtype=np.int64)
+    melhor_len = np.zeros(contagens.shape[:-1], dtype=np.int64)
+
+    for w in range(janela_minima, janela_maxima + 1):
+        casos = acumulado[..., w:] - acumulado[..., :-w]
+        esperados = (prob_acumulada[w:] - prob_acumulada[:-w]) * total
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_esperados = np.log(esperados)
+            log_resto = np.log(total - esperados)
+
+        resto = total - casos
+        llr = klogk[casos] + klogk[resto] - casos * log_esperados - resto * log_resto
+        llr[casos <= esperados] = 0.0
+
+        ini = llr.argmax(axis=-1)
+        valor = np.take_along_axis(llr, ini[..., None], axis=-1)[..., 0]
+        maior = valor > melhor
+        melhor = np.where(maior, valor, melhor)
+        melhor_ini = np.where(maior, ini, melhor_ini)
+        melhor_len = np.where(maior, w, melhor_len)
+
+    return melhor, melhor_ini, melhor_len
+
+
+def _p_valor_monte_carlo(
+    rng: np.random.Generator,
+    llr_observado: float,
+    total: int,
+    probabilidades: np.ndarray,
+    prob_acumulada: np.ndarray,
+    n_permutacoes: int,
+    limite_excedencias: int,
+    tamanho_lote: int,
+    janela_minima: int,
+    janela_maxima: int,
+) -> float:
+    """
+    P-valor de Monte Carlo, com as réplicas geradas e avaliadas em lotes.
+
+    Com limite_excedencias > 0 usa o procedimento sequencial de Besag e
+    Clifford: assim que 'limite_excedencias' réplicas igualam ou superam o
+    valor observado, para e devolve excedências / réplicas. Municípios sem
+    aglomerado relevante param logo no primeiro lote.
+    """
+    excedencias = 0
+    feitas = 0
+    while feitas < n_permutacoes:
+        lote = min(tamanho_lote, n_permutacoes - feitas)
+        simuladas = rng.multinomial(total, probabilidades, size=lote)
+        llr_sim, _, _ = _varrer_janelas(simuladas, total, prob_acumulada, janela_minima, janela_maxima)
+
+        excedencias += int(np.count_nonzero(llr_sim >= llr_observado))
+        feitas += lote
+        if limite_excedencias and excedencias >= limite_excedencias:
+            return excedencias / feitas
+
+    return (1 + excedencias) / (n_permutacoes + 1)
+
+
+def _varrer_bloco(args: tuple) -> list[dict]:
+    """
+    Varre um bloco de municípios (executado em um processo do pool).
+    """
+    (matriz, probabilidades, n_permutacoes, limite_excedencias, tamanho_lote,
+     semente, janela_minima, janela_maxima) = args
+    rng = np.random.default_rng(semente)
+    prob_acumulada = np.r_[0.0, np.cumsum(probabilidades)]
+
+    resultados = []
+    for serie in matriz:
+        total = int(serie.sum())
+        if total == 0:
+            resultados.append(None)
+            continue
+
+        llr, ini, comp = _varrer_janelas(serie, total, prob_acumulada, janela_minima, janela_maxima)
+        llr, ini, comp = float(llr), int(ini), int(comp)
+
+        p_valor = _p_valor_monte_carlo(
+            rng, llr, total, probabilidades, prob_acumulada, n_permutacoes,
+            limite_excedencias, tamanho_lote, janela_minima, janela_maxima,
+        ) if llr > 0 else 1.0
+
+        resultados.append({
+            "inicio": ini,
+            "semanas": comp,
+            "casos": float(serie[ini:ini + comp].sum()),
+            "esperados": float((prob_acumulada[ini + comp] - prob_acumulada[ini]) * total),
+            "llr": llr,
+            "p_valor": p_valor,
+        })
+    return resultados
+
+
+def varredura_temporal_municipios(
+    quadro: pd.DataFrame,
+    n_permutacoes: int = 999,
+    janela_minima: int = 2,
+    janela_maxima: int = 12,
+    linha_base: str = "nacional",
+    limite_excedencias: int = 50,
+    tamanho_lote: int = 100,
+    semente: int = 42,
+    n_processos: int | None = None,
+    tamanho_bloco: int = 200,
+) -> pd.DataFrame:
+    """
+    Encontra, para cada município de residência, o aglomerado temporal de
+    janela_minima..janela_maxima semanas com maior excesso de casos e o seu
+    p-valor por Monte Carlo.
+
+    linha_base:
+        "nacional" -> esperado proporcional à curva semanal do país inteiro
+                      (detecta excesso além da sazonalidade comum)
+        "uniforme" -> esperado igual em todas as semanas
+
+    As réplicas são geradas em lotes de 'tamanho_lote'; com
+    limite_excedencias > 0 a simulação de um município para assim que o
+    p-valor claramente não será significativo (Besag e Clifford). Use
+    limite_excedencias=0 para rodar sempre as n_permutacoes réplicas.
+
+    Saída: uma linha por município com casos, colunas
+        ['id_mn_resi', 'semana_inicio', 'semana_fim', 'semanas', 'casos',
+         'esperados', 'risco_relativo', 'llr', 'p_valor']
+    """
+    if linha_base not in ("nacional", "uniforme"):
+        raise ValueError(f"Linha de base desconhecida: '{linha_base}'")
+
+    matriz, municipios, semanas = matriz_series_semanais(quadro, nivel="municipio")
+    matriz = matriz.astype(np.int64)
+    janela_maxima = min(janela_maxima, matriz.shape[1])
+
+    if linha_base == "nacional":
+        probabilidades = matriz.sum(axis=0) / matriz.sum()
+    else:
+        probabilidades = np.full(matriz.shape[1], 1.0 / matriz.shape[1])
+
+    sementes = np.random.SeedSequence(semente).spawn((len(matriz) + tamanho_bloco - 1) // tamanho_bloco)
+    blocos = [
+        (matriz[i:i + tamanho_bloco], probabilidades, n_permutacoes, limite_excedencias,
+         tamanho_lote, s, janela_minima, janela_maxima)
+        for i, s in zip(range(0, len(matriz), tamanho_bloco), sementes)
+    ]
+
+    if n_processos == 1 or len(blocos) <= 1:
+        resultados = [_varrer_bloco(b) for b in blocos]
+    else:
+        with ProcessPoolExecutor(max_workers=n_processos or os.cpu_count()) as executor:
+            resultados = list(executor.map(_varrer_bloco, blocos))
+
+    linhas = []
+    for municipio, r in zip(municipios, (r for bloco in resultados for r in bloco)):
+        if r is None:
+            continue
+        linhas.append({
+            "id_mn_resi": municipio,
+            "semana_inicio": semanas[r["inicio"]],
+            "semana_fim": semanas[r["inicio"] + r["semanas"] - 1],
+            "semanas": r["semanas"],
+            "casos": r["casos"],
+            "esperados": r["esperados"],
+            "risco_relativo": r["casos"] / r["esperados"] if r["esperados"] > 0 else np.nan,
+            "llr": r["llr"],
+            "p_valor": r["p_valor"],
+        })
+
+    tabela = pd.DataFrame(linhas)
+    print(f"Varredura temporal: {len(tabela)} municípios, {n_permutacoes} réplicas cada.")
+    return tabela
+
+
+def aglomerados_significativos(varredura: pd.DataFrame, alfa: float = 0.05) -> pd.DataFrame:
+    """
+    Filtra os aglomerados com p-valor < alfa, do maior para o menor LLR.
+    """
+    if varredura.empty:
+        return varredura
+    return (
+        varredura[varredura["p_valor"] < alfa]
+        .sort_values("llr", ascending=False)
+        .reset_index(drop=True)
+    )
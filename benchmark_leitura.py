@@ -0,0 +1,68 @@
+import sys
+import time
+
+import pandas as pd
+
+from algoritmos.limpeza_dados import leitor_csv_zip, MOTORES_LEITURA
+
+
+def comparar_motores_leitura(
+    caminho_zip: str,
+    colunas: list[str],
+    repeticoes: int = 3,
+) -> pd.DataFrame:
+    """
+    Mede o tempo de leitura de um .zip com cada motor e confere se todos
+    produzem exatamente o mesmo DataFrame que o motor pandas.
+    """
+    referencia = None
+    linhas = []
+
+    for motor in MOTORES_LEITURA:
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            quadro = leitor_csv_zip(caminho_zip, colunas, motor=motor)
+            tempos.append(time.perf_counter() - inicio)
+
+        if referencia is None:
+            referencia = quadro
+            igual = True
+        else:
+            try:
+                pd.testing.assert_frame_equal(referencia, quadro)
+                igual = True
+            except AssertionError as e:
+                print(f"Saída do motor '{motor}' difere do pandas:\n{e}")
+                igual = False
+
+        linhas.append({
+            "motor": motor,
+            "linhas": len(quadro),
+            "melhor_tempo_s": min(tempos),
+            "tempo_medio_s": sum(tempos) / len(tempos),
+            "saida_identica": igual,
+        })
+
+    resultado = pd.DataFrame(linhas)
+    resultado["aceleracao"] = resultado["melhor_tempo_s"].iloc[0] / resultado["melhor_tempo_s"]
+    return resultado
+
+
+if __name__ == "__main__":
+    caminho = sys.argv[1] if len(sys.argv) > 1 else "dados/DENGBR24.zip"
+
+    colunas_necessarias = [
+        "DT_NOTIFIC",
+        "SEM_NOT",
+        "NU_ANO",
+        "SG_UF_NOT",
+        "DT_SIN_PRI",
+        "NU_IDADE_N",
+        "CS_SEXO",
+        "CLASSI_FIN",
+        "ID_MN_RESI",
+        "MUNICIPIO"
+    ]
+
+    print(comparar_motores_leitura(caminho, colunas_necessarias))
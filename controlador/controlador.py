@@ -20,12 +20,80 @@ from visualizacao.grafico import (
     grafico_top_municipios_graves_sp
 )
 from algoritmos.municipios import carregar_mapa_municipios_sp_de_txt
+from algoritmos.deduplicacao import leitor_geral_deduplicado_zip
+from algoritmos.validacao import validar_dados
+from algoritmos.indice import ordenar_por_uf_ano_municipio
+from algoritmos.previsao import prever_casos_semanais, backtest_previsao
+from algoritmos.varredura_temporal import varredura_temporal_municipios, aglomerados_significativos
+from algoritmos.nowcasting import distribuicao_atrasos, nowcast_semanal
+from algoritmos.exportacao import exportar_resultados_sqlite
+from algoritmos.cache import estatisticas_cache, impressao_digital_zips
+
+
+def carregar_dados(
+    caminhos_zip: list[str],
+    colunas_necessarias: list[str],
+    deduplicar: bool = False,
+    validar: bool = True,
+    motor: str = "pandas",
+    fracao_amostra: float | None = None,
+    semente: int = 42,
+):
+    """
+    Leitura e limpeza comuns a todas as análises:
+    leitura dos .zip, validação com quarentena das linhas inválidas,
+    conversão de datas, remoção dos casos descartados e ordenação por
+    (UF, ano, município) para que os filtros por UF sejam fatias do índice.
+
+    Devolve um QuadroIndexado (algoritmos/indice.py); as análises que não
+    filtram por UF recebem o DataFrame em dados.quadro.
+
+    deduplicar=True remove notificações repetidas entre arquivos diferentes
+    (ver deduplicacao.leitor_geral_deduplicado_zip). É opcional porque as
+    chaves disponíveis (município, idade, sexo e datas) não distinguem
+    pacientes diferentes com o mesmo perfil.
+
+    fracao_amostra (ex.: 0.05) ativa o modo exploratório: cada .zip é
+    reduzido a uma amostra estratificada reproduzível e as estatísticas
+    passam a devolver totais estimados com erro padrão.
+    """
+    if deduplicar:
+        dados, relatorio_dup = leitor_geral_deduplicado_zip(
+            caminhos_zip, colunas_necessarias, motor=motor,
+            fracao_amostra=fracao_amostra, semente=semente,
+        )
+        if not relatorio_dup.empty:
+            print("\nDuplicatas removidas por ano e UF:")
+            print(relatorio_dup)
+    else:
+        dados = leitor_geral_especifico_zip(
+            caminhos_zip, colunas_necessarias, motor=motor,
+            fracao_amostra=fracao_amostra, semente=semente,
+        )
+
+    if validar:
+        dados, falhas_por_regra = validar_dados(dados)
+        print("\nLinhas reprovadas por regra de validação:")
+        print(falhas_por_regra)
 
-def executar_evolucao_temporal_sp(caminhos_zip: list[str], colunas_necessarias: list[str]):
-    # 1) Ler e limpar
-    dados = leitor_geral_especifico_zip(caminhos_zip, colunas_necessarias)
     dados = converter_datas(dados)
     dados = filtrar_classificados(dados)
+    # os .zip e os parâmetros de leitura identificam os dados para o cache,
+    # sem hash do conteúdo a cada chamada
+    impressao = impressao_digital_zips(
+        caminhos_zip, colunas_necessarias, deduplicar, validar, motor, fracao_amostra, semente
+    )
+    dados = ordenar_por_uf_ano_municipio(dados, impressao=impressao)
+
+    return dados
+
+def executar_evolucao_temporal_sp(
+    caminhos_zip: list[str],
+    colunas_necessarias: list[str],
+    fracao_amostra: float | None = None,
+):
+    # 1) Ler e limpar
+    dados = carregar_dados(caminhos_zip, colunas_necessarias, fracao_amostra=fracao_amostra)
 
     # 2) Contagens
     semana_sp = contagem_semanal_uf(dados, uf_cod=35)
@@ -54,15 +122,15 @@ def executar_evolucao_temporal_sp(caminhos_zip: list[str], colunas_necessarias:
 
 
 
-def executar_evolucao_e_gravidade_sp(caminhos_zip: list[str], colunas_necessarias: list[str]):
+def executar_evolucao_e_gravidade_sp(
+    caminhos_zip: list[str],
+    colunas_necessarias: list[str],
+    fracao_amostra: float | None = None,
+):
     # 1) Ler e limpar
-    dados = leitor_geral_especifico_zip(caminhos_zip, colunas_necessarias)
-    print(f"Total de linhas após leitura geral (zip): {len(dados)}")
+    dados = carregar_dados(caminhos_zip, colunas_necessarias, fracao_amostra=fracao_amostra)
     print(f"Colunas do DataFrame final: {list(dados.columns)}")
 
-    dados = converter_datas(dados)
-    dados = filtrar_classificados(dados)
-
     # 2) Evolução temporal
     semana_sp = contagem_semanal_uf(dados, uf_cod=35)
     ano_sp = contagem_anual_uf(dados, uf_cod=35)
@@ -89,15 +157,19 @@ def executar_evolucao_e_gravidade_sp(caminhos_zip: list[str], colunas_necessaria
 
     grafico_proporcao_graves_sp(tabela_grav)
 
+    print(f"\nCache de resultados: {estatisticas_cache()}")
+
 
 
 
 
-def executar_perfil_demografico_sp(caminhos_zip: list[str], colunas_necessarias: list[str]):
+def executar_perfil_demografico_sp(
+    caminhos_zip: list[str],
+    colunas_necessarias: list[str],
+    fracao_amostra: float | None = None,
+):
     # 1) Leitura e limpeza
-    dados = leitor_geral_especifico_zip(caminhos_zip, colunas_necessarias)
-    dados = converter_datas(dados)
-    dados = filtrar_classificados(dados)
+    dados = carregar_dados(caminhos_zip, colunas_necessarias, fracao_amostra=fracao_amostra)
 
     # 2) Perfil demográfico
     perfil = perfil_demografico(dados)
@@ -118,10 +190,8 @@ def executar_perfil_demografico_sp(caminhos_zip: list[str], colunas_necessarias:
 
 
 
-def executar_analise_municipios_sp(caminhos_zip, colunas_necessarias):
-    dados = leitor_geral_especifico_zip(caminhos_zip, colunas_necessarias)
-    dados = converter_datas(dados)
-    dados = filtrar_classificados(dados)
+def executar_analise_municipios_sp(caminhos_zip, colunas_necessarias, fracao_amostra=None):
+    dados = carregar_dados(caminhos_zip, colunas_necessarias, fracao_amostra=fracao_amostra)
 
     # 2) carrega mapa de municípios a partir do txt do IBGE
     mapa_mun_sp = carregar_mapa_municipios_sp_de_txt(
@@ -152,4 +222,174 @@ def executar_analise_municipios_sp(caminhos_zip, colunas_necessarias):
         caminho_saida="resultados/top_municipios_graves_sp.png",
     )
 
-    return tabela_mun, tabela_mun_graves
\ No newline at end of file
+    return tabela_mun, tabela_mun_graves
+
+
+
+
+def executar_previsao_semanal(
+    caminhos_zip: list[str],
+    colunas_necessarias: list[str],
+    nivel: str = "municipio",
+    horizonte: int = 8,
+    modelo: str = "suavizacao_sazonal",
+):
+    dados = carregar_dados(caminhos_zip, colunas_necessarias)
+
+    # 1) Backtest de todos os modelos ao longo de 2020–2025
+    avaliacao = backtest_previsao(dados.quadro, nivel=nivel, horizonte=horizonte)
+
+    print(f"\nBacktest dos modelos de previsão (nível: {nivel}, {horizonte} semanas):")
+    print(avaliacao.groupby("modelo")[["mae", "rmse", "wape"]].mean())
+
+    # 2) Previsão para todas as séries
+    previsao = prever_casos_semanais(dados.quadro, nivel=nivel, horizonte=horizonte, modelo=modelo)
+
+    print(f"\nPrevisão das próximas {horizonte} semanas ({modelo}):")
+    print(previsao.head(20))
+
+    return previsao, avaliacao
+
+
+
+
+def executar_varredura_temporal(
+    caminhos_zip: list[str],
+    colunas_necessarias: list[str],
+    n_permutacoes: int = 999,
+    alfa: float = 0.05,
+):
+    dados = carregar_dados(caminhos_zip, colunas_necessarias)
+
+    # aglomerados de várias semanas com excesso de casos, por município
+    varredura = varredura_temporal_municipios(dados.quadro, n_permutacoes=n_permutacoes)
+    significativos = aglomerados_significativos(varredura, alfa=alfa)
+
+    print(f"\nAglomerados temporais significativos (p < {alfa}): {len(significativos)} municípios")
+    print(significativos.head(20))
+
+    return varredura, significativos
+
+
+
+
+def executar_nowcasting(
+    caminhos_zip: list[str],
+    colunas_necessarias: list[str],
+    nivel: str = "municipio",
+    max_atraso: int = 12,
+):
+    dados = carregar_dados(caminhos_zip, colunas_necessarias)
+
+    # 1) Atraso entre início dos sintomas e notificação, por UF e ano
+    atrasos = distribuicao_atrasos(dados.quadro, periodo="ano", max_atraso=max_atraso)
+
+    print("\nDistribuição do atraso de notificação (semanas) – São Paulo:")
+    print(atrasos[atrasos["sg_uf_not"] == 35])
+
+    # 2) Correção das semanas recentes de todas as séries
+    nowcast = nowcast_semanal(dados.quadro, nivel=nivel, max_atraso=max_atraso)
+
+    print(f"\nCasos estimados nas últimas {max_atraso} semanas ({nivel}):")
+    print(nowcast.head(20))
+
+    return nowcast, atrasos
+
+
+
+
+def executar_exportacao_sqlite(
+    caminhos_zip: list[str],
+    colunas_necessarias: list[str],
+    caminho_db: str = "resultados/resultados.sqlite",
+    anos: list[int] | None = None,
+):
+    dados = carregar_dados(caminhos_zip, colunas_necessarias)
+
+    mapa_mun_sp = carregar_mapa_municipios_sp_de_txt(
+        "dados/municipios_sp_lista.txt"
+    )
+
+    # todas as UFs; com 'anos', só atualiza esses anos no banco
+    return exportar_resultados_sqlite(dados, caminho_db, anos=anos, mapa_mun=mapa_mun_sp)
+
+
+
+
+def executar_evolucao_e_gravidade_sp_lazy(
+    caminhos_zip: list[str],
+    colunas_necessarias: list[str],
+    diretorio_parquet: str = "dados_parquet",
+    validar: bool = True,
+):
+    # import local: duckdb e pyarrow são dependências opcionais
+    from algoritmos.consulta_lazy import (
+        preparar_parquet,
+        abrir_consulta,
+        contagem_semanal_uf_lazy,
+        contagem_anual_uf_lazy,
+        tabela_gravidade_por_ano_uf_lazy,
+    )
+
+    # 1) Conversão para Parquet (só quando o .zip ou a limpeza mudou), com a
+    #    mesma validação de carregar_dados, + visão lazy
+    preparar_parquet(caminhos_zip, colunas_necessarias, diretorio_parquet, validar=validar)
+    conexao = abrir_consulta(diretorio_parquet)
+
+    # 2) Mesmas tabelas da versão pandas, calculadas pelo DuckDB
+    semana_sp = contagem_semanal_uf_lazy(conexao, uf_cod=35)
+    ano_sp = contagem_anual_uf_lazy(conexao, uf_cod=35)
+    tabela_grav = tabela_gravidade_por_ano_uf_lazy(conexao, uf_cod=35)
+
+    resumo_ano, outliers = resumo_temporal_por_ano(semana_sp)
+
+    print("\nContagem anual em SP (motor lazy):")
+    print(ano_sp)
+
+    print("\nResumo estatístico por ano – São Paulo:")
+    print(resumo_ano)
+
+    print("\nTabela de gravidade por ano – São Paulo:")
+    print(tabela_grav)
+
+    grafico_linha_semanal_sp(semana_sp)
+    grafico_barras_anual_sp(ano_sp)
+    grafico_proporcao_graves_sp(tabela_grav)
+
+
+
+
+def executar_analises_sp_limite_memoria(
+    caminhos_zip: list[str],
+    colunas_necessarias: list[str],
+    limite_memoria_mb: float = 2048,
+):
+    # import local: só este modo usa a leitura em blocos
+    from algoritmos.execucao_limitada import estatisticas_com_limite_memoria
+
+    mapa_mun_sp = carregar_mapa_municipios_sp_de_txt(
+        "dados/municipios_sp_lista.txt"
+    )
+
+    # mesmas tabelas de carregar_dados(deduplicar=False) + estatísticas,
+    # sem nunca carregar a base inteira
+    tabelas = estatisticas_com_limite_memoria(
+        caminhos_zip, colunas_necessarias, uf_cod=35,
+        limite_memoria_mb=limite_memoria_mb, mapa_mun=mapa_mun_sp,
+    )
+
+    resumo_ano, outliers = resumo_temporal_por_ano(tabelas["contagem_semanal"])
+
+    print("\nContagem anual em SP (limite de memória):")
+    print(tabelas["contagem_anual"])
+
+    print("\nResumo estatístico por ano – São Paulo:")
+    print(resumo_ano)
+
+    print("\nTabela de gravidade por ano – São Paulo:")
+    print(tabelas["gravidade"])
+
+    print("\nTop 20 municípios de SP com mais casos graves:")
+    print(tabelas["casos_graves_por_municipio"])
+
+    return tabelas
@@ -0,0 +1,572 @@
+import os
+import sys
+import time
+import zipfile
+import tempfile
+import contextlib
+from typing import Callable, NamedTuple
+
+import pandas as pd
+import numpy as np
+
+import algoritmos.cache as cache
+from algoritmos import referencia
+from algoritmos import estatisticas
+from algoritmos.limpeza_dados import leitor_csv_zip, converter_datas
+from algoritmos.filtragem import filtrar_classificados
+from algoritmos.indice import ordenar_por_uf_ano_municipio, QuadroIndexado
+from algoritmos.execucao_limitada import agregar_com_limite_memoria, memoria_residente
+from algoritmos.municipios import carregar_mapa_municipios_sp_de_txt
+from controlador.controlador import carregar_dados
+
+# -------------------------------------------------------------------
+# EQUIVALÊNCIA DOS MOTORES OTIMIZADOS COM O PANDAS ORIGINAL
+# -------------------------------------------------------------------
+#
+# Gera bases sintéticas no formato DENGBR, roda as implementações de
+# referência (algoritmos/referencia.py) e cada motor alternativo, compara
+# as saídas célula a célula (com tolerância para números) e mede o tempo
+# de cada função. Novos motores entram em MOTORES.
+#
+# Além da base original, os motores que trabalham sobre o quadro em
+# memória são verificados depois de ALTERACOES feitas no quadro já
+# preparado (índice ordenado, cache preenchido), sem mudar o número de
+# linhas: nenhum estado calculado antes da alteração pode ser reaproveitado.
+# A alteração é feita no DataFrame de QuadroIndexado.quadro, como faria
+# quem usa o resultado de carregar_dados.
+
+COLUNAS = [
+    "DT_NOTIFIC", "SEM_NOT", "NU_ANO", "SG_UF_NOT", "DT_SIN_PRI",
+    "NU_IDADE_N", "CS_SEXO", "CLASSI_FIN", "ID_MN_RESI",
+]
+
+FUNCOES = [
+    "contagem_semanal_uf",
+    "resumo_temporal_por_ano",
+    "tabela_gravidade_por_ano_uf",
+    "perfil_por_ano",
+    "casos_por_municipio_sp",
+    "casos_graves_por_municipio_sp",
+]
+
+# Ordem das linhas que não é definida pela função (empates nos rankings)
+CHAVES_ORDENACAO = {
+    "casos_por_municipio_sp": ["id_mn_resi_6"],
+    "casos_graves_por_municipio_sp": ["id_mn_resi_6"],
+}
+
+
+class Contexto(NamedTuple):
+    """
+    Entrada comum a todos os motores:
+    - quadro: base já lida e limpa (leitura + datas + descartados)
+    - caminho_zip: o mesmo arquivo, para motores que leem por conta própria
+    - mapa_mun: códigos e nomes de municípios
+    - uf_cod: UF analisada
+    - diretorio: pasta temporária do motor (cache, Parquet, despejos)
+    - alterar: alteração aplicada ao quadro depois do preparo do motor
+    """
+    quadro: pd.DataFrame
+    caminho_zip: str
+    mapa_mun: pd.DataFrame
+    uf_cod: int
+    diretorio: str
+    alterar: Callable[[pd.DataFrame], pd.DataFrame] | None = None
+
+
+# -------------------------------------------------------------------
+# DADOS SINTÉTICOS
+# -------------------------------------------------------------------
+
+def gerar_dados_sinteticos(n_linhas: int, semente: int = 42) -> pd.DataFrame:
+    """
+    Base no formato dos CSV DENGBR (colunas de COLUNAS, datas como texto),
+    com valores ausentes, casos descartados (CLASSI_FIN = 5) e idades na
+    codificação do SINAN, para exercitar os mesmos caminhos da base real.
+    """
+    rng = np.random.default_rng(semente)
+
+    ufs = np.array([35, 33, 31, 41, 29])
+    uf = rng.choice(ufs, n_linhas, p=[0.5, 0.15, 0.15, 0.1, 0.1])
+    ano = rng.choice([2022, 2023, 2024], n_linhas)
+
+    # casos concentrados no começo do ano, como na sazonalidade da dengue
+    dia = np.minimum(rng.gamma(4.0, 25.0, n_linhas).astype(int), 363)
+    inicio = pd.to_datetime(ano.astype(str), format="%Y") + pd.to_timedelta(dia, unit="D")
+    notificacao = inicio + pd.to_timedelta(rng.geometric(0.25, n_linhas) - 1, unit="D")
+    semana = np.minimum(dia // 7 + 1, 52)
+
+    idade = rng.integers(0, 95, n_linhas).astype(float)
+    codificada = rng.random(n_linhas) < 0.05
+    idade[codificada] = 4000 + idade[codificada]
+
+    municipio = (uf * 10_000 + rng.integers(1, 646, n_linhas) * 10).astype(float)
+
+    quadro = pd.DataFrame({
+        "DT_NOTIFIC": notificacao.strftime("%Y-%m-%d"),
+        "SEM_NOT": (ano * 100 + semana).astype(float),
+        "NU_ANO": ano,
+        "SG_UF_NOT": uf,
+        "DT_SIN_PRI": inicio.strftime("%Y-%m-%d"),
+        "NU_IDADE_N": idade,
+        "CS_SEXO": rng.choice(["M", "F", "I"], n_linhas, p=[0.47, 0.5, 0.03]),
+        "CLASSI_FIN": rng.choice([5.0, 8.0, 10.0, 11.0, 12.0], n_linhas,
+                                 p=[0.3, 0.05, 0.5, 0.1, 0.05]),
+        "ID_MN_RESI": municipio,
+    })
+
+    # valores ausentes espalhados
+    for coluna, fracao in [("SEM_NOT", 0.01), ("NU_IDADE_N", 0.02), ("CS_SEXO", 0.01),
+                           ("CLASSI_FIN", 0.05), ("ID_MN_RESI", 0.01), ("DT_SIN_PRI", 0.01)]:
+        quadro.loc[rng.random(n_linhas) < fracao, coluna] = np.nan
+
+    return quadro
+
+
+def gravar_zip_sintetico(quadro: pd.DataFrame, caminho_zip: str) -> str:
+    """
+    Grava a base como um CSV dentro de um .zip, como os arquivos DENGBR.
+    """
+    nome_csv = os.path.splitext(os.path.basename(caminho_zip))[0] + ".csv"
+    with zipfile.ZipFile(caminho_zip, "w", compression=zipfile.ZIP_DEFLATED) as z:
+        z.writestr(nome_csv, quadro.to_csv(index=False))
+    return caminho_zip
+
+
+# -------------------------------------------------------------------
+# ALTERAÇÕES DO QUADRO (mesmo número de linhas)
+# -------------------------------------------------------------------
+
+def _reordenar(quadro: pd.DataFrame) -> pd.DataFrame:
+    """
+    Nova ordem das linhas (os attrs do quadro vão junto com o sort).
+    """
+    return quadro.sort_values(["dt_notific", "nu_idade_n"], kind="stable")
+
+
+def _editar_uf(quadro: pd.DataFrame) -> pd.DataFrame:
+    """
+    Edita no lugar uma coluna da chave do índice: casos do RJ passam para SP.
+    """
+    quadro.loc[quadro["sg_uf_not"] == 33, "sg_uf_not"] = 35
+    return quadro
+
+
+def _editar_classificacao(quadro: pd.DataFrame) -> pd.DataFrame:
+    """
+    Edita no lugar uma coluna fora da chave: casos com sinais de alarme de
+    2023 passam a graves.
+    """
+    quadro.loc[(quadro["classi_fin"] == 11) & (quadro["nu_ano"] == 2023), "classi_fin"] = 12.0
+    return quadro
+
+
+ALTERACOES = {
+    "nenhuma": None,
+    "reordenado": _reordenar,
+    "uf_editada": _editar_uf,
+    "classificacao_editada": _editar_classificacao,
+}
+
+# Motores que leem os .zip por conta própria não veem alterações em memória
+MOTORES_ALTERAVEIS = {"indice_tabulacao", "cache", "carregar_dados"}
+
+
+def _alterado(quadro: QuadroIndexado, ctx: Contexto) -> QuadroIndexado | pd.DataFrame:
+    """
+    Sem alteração, o próprio quadro do motor; com alteração, o DataFrame
+    alterado (uma cópia: o QuadroIndexado e o seu índice não mudam).
+    """
+    return quadro if ctx.alterar is None else ctx.alterar(quadro.quadro)
+
+
+# -------------------------------------------------------------------
+# MOTORES (cada um devolve {função: chamada sem argumentos})
+# -------------------------------------------------------------------
+
+@contextlib.contextmanager
+def _cache_configurado(ativo: bool, diretorio: str | None = None):
+    anterior = (cache.CACHE_ATIVO, cache.DIRETORIO_CACHE)
+    cache.CACHE_ATIVO = ativo
+    if diretorio is not None:
+        cache.DIRETORIO_CACHE = diretorio
+    try:
+        yield
+    finally:
+        cache.CACHE_ATIVO, cache.DIRETORIO_CACHE = anterior
+
+
+def _funcoes_estatisticas(quadro_temporal, quadro_perfil, quadro_municipio, ctx: Contexto):
+    """
+    Chamadas das funções de algoritmos/estatisticas.py sobre os quadros
+    que cada motor prepara.
+    """
+    uf, mapa, top = ctx.uf_cod, ctx.mapa_mun, len(ctx.quadro)
+    return {
+        "contagem_semanal_uf": lambda: estatisticas.contagem_semanal_uf(quadro_temporal, uf_cod=uf),
+        "resumo_temporal_por_ano": lambda: estatisticas.resumo_temporal_por_ano(
+            estatisticas.contagem_semanal_uf(quadro_temporal, uf_cod=uf)),
+        "tabela_gravidade_por_ano_uf": lambda: estatisticas.tabela_gravidade_por_ano_uf(
+            quadro_temporal, uf_cod=uf),
+        "perfil_por_ano": lambda: estatisticas.perfil_por_ano(quadro_perfil, uf_cod=uf),
+        "casos_por_municipio_sp": lambda: estatisticas.casos_por_municipio_sp(
+            quadro_municipio, mapa, uf_cod=uf, top_n=top),
+        "casos_graves_por_municipio_sp": lambda: estatisticas.casos_graves_por_municipio_sp(
+            quadro_municipio, mapa, uf_cod=uf, top_n=top),
+    }
+
+
+def _sem_cache(funcoes: dict[str, Callable]) -> dict[str, Callable]:
+    def envolver(f):
+        def chamada():
+            with _cache_configurado(False):
+                return f()
+        return chamada
+    return {nome: envolver(f) for nome, f in funcoes.items()}
+
+
+def motor_referencia(ctx: Contexto) -> dict[str, Callable]:
+    """
+    Pandas original (algoritmos/referencia.py).
+    """
+    q, uf, mapa, top = ctx.quadro, ctx.uf_cod, ctx.mapa_mun, len(ctx.quadro)
+    return {
+        "contagem_semanal_uf": lambda: referencia.contagem_semanal_uf(q, uf_cod=uf),
+        "resumo_temporal_por_ano": lambda: referencia.resumo_temporal_por_ano(
+            referencia.contagem_semanal_uf(q, uf_cod=uf)),
+        "tabela_gravidade_por_ano_uf": lambda: referencia.tabela_gravidade_por_ano_uf(q, uf_cod=uf),
+        "perfil_por_ano": lambda: referencia.perfil_por_ano(q, uf_cod=uf),
+        "casos_por_municipio_sp": lambda: referencia.casos_por_municipio_sp(
+            q, mapa, uf_cod=uf, top_n=top),
+        "casos_graves_por_municipio_sp": lambda: referencia.casos_graves_por_municipio_sp(
+            q, mapa, uf_cod=uf, top_n=top),
+    }
+
+
+def motor_indice_tabulacao(ctx: Contexto) -> dict[str, Callable]:
+    """
+    Versão atual de estatisticas.py (fatias do índice ordenado e tabulação
+    cruzada), sem cache. Depois de uma alteração, o índice é refeito.
+    """
+    ordenado = ordenar_por_uf_ano_municipio(ctx.quadro.copy())
+    if ctx.alterar is not None:
+        ordenado = ordenar_por_uf_ano_municipio(_alterado(ordenado, ctx))
+    return _sem_cache(_funcoes_estatisticas(ordenado, ordenado, ordenado, ctx))
+
+
+def motor_cache(ctx: Contexto) -> dict[str, Callable]:
+    """
+    Versão atual com o cache em disco já preenchido (mede o acerto), sobre
+    o quadro de carregar_dados, como nas análises. Com 'alterar', o cache é
+    preenchido com o quadro original e as chamadas medidas usam o quadro
+    alterado: a primeira precisa recalcular.
+    """
+    diretorio = os.path.join(ctx.diretorio, "cache")
+
+    def envolver(f):
+        def chamada():
+            with _cache_configurado(True, diretorio):
+                return f()
+        return chamada
+
+    def preencher(quadro: pd.DataFrame) -> dict[str, Callable]:
+        funcoes = {
+            nome: envolver(f)
+            for nome, f in _funcoes_estatisticas(quadro, quadro, quadro, ctx).items()
+        }
+        for f in funcoes.values():
+            f()
+        return funcoes
+
+    dados = carregar_dados([ctx.caminho_zip], COLUNAS)
+    funcoes = preencher(dados)
+    if ctx.alterar is not None:
+        funcoes = preencher(_alterado(dados, ctx))
+    return funcoes
+
+
+def motor_carregar_dados(ctx: Contexto) -> dict[str, Callable]:
+    """
+    Caminho padrão das análises: controlador.carregar_dados (leitura,
+    validação, datas, descartados e ordenação), sem cache.
+    """
+    dados = _alterado(carregar_dados([ctx.caminho_zip], COLUNAS), ctx)
+    return _sem_cache(_funcoes_estatisticas(dados, dados, dados, ctx))
+
+
+def motor_blocos(ctx: Contexto) -> dict[str, Callable]:
+    """
+    Leitura em blocos com limite de memória e cubos de contagem
+    (algoritmos/execucao_limitada.py).
+    """
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        cubos = agregar_com_limite_memoria(
+            [ctx.caminho_zip], COLUNAS,
+            limite_memoria_mb=memoria_residente() / 2**20 + 256,
+            validar=False,
+            diretorio_despejo=os.path.join(ctx.diretorio, "despejo"),
+        )
+    return _sem_cache(_funcoes_estatisticas(cubos["temporal"], cubos["perfil"], cubos["municipio"], ctx))
+
+
+def motor_lazy(ctx: Contexto) -> dict[str, Callable] | None:
+    """
+    DuckDB sobre Parquet (algoritmos/consulta_lazy.py). Sem duckdb/pyarrow
+    instalados, o motor é ignorado.
+    """
+    try:
+        from algoritmos import consulta_lazy as lazy
+        import duckdb  # noqa: F401
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return None
+
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        diretorio = lazy.preparar_parquet(
+            [ctx.caminho_zip], COLUNAS, os.path.join(ctx.diretorio, "parquet"), validar=False)
+    con = lazy.abrir_consulta(diretorio)
+    uf, mapa, top = ctx.uf_cod, ctx.mapa_mun, len(ctx.quadro)
+    return _sem_cache({
+        "contagem_semanal_uf": lambda: lazy.contagem_semanal_uf_lazy(con, uf_cod=uf),
+        "resumo_temporal_por_ano": lambda: estatisticas.resumo_temporal_por_ano(
+            lazy.contagem_semanal_uf_lazy(con, uf_cod=uf)),
+        "tabela_gravidade_por_ano_uf": lambda: lazy.tabela_gravidade_por_ano_uf_lazy(con, uf_cod=uf),
+        "perfil_por_ano": lambda: lazy.perfil_por_ano_lazy(con, uf_cod=uf),
+        "casos_por_municipio_sp": lambda: lazy.casos_por_municipio_sp_lazy(
+            con, mapa, uf_cod=uf, top_n=top),
+        "casos_graves_por_municipio_sp": lambda: lazy.casos_graves_por_municipio_sp_lazy(
+            con, mapa, uf_cod=uf, top_n=top),
+    })
+
+
+MOTORES = {
+    "indice_tabulacao": motor_indice_tabulacao,
+    "cache": motor_cache,
+    "carregar_dados": motor_carregar_dados,
+    "blocos": motor_blocos,
+    "lazy": motor_lazy,
+}
+
+
+# -------------------------------------------------------------------
+# COMPARAÇÃO
+# -------------------------------------------------------------------
+
+def comparar_quadros(
+    referencia_df: pd.DataFrame,
+    candidato: pd.DataFrame,
+    chaves: list[str] | None = None,
+    rtol: float = 1e-9,
+    atol: float = 1e-9,
+    dtypes_estritos: bool = False,
+) -> dict:
+    """
+    Compara dois DataFrames célula a célula. Números são iguais dentro de
+    rtol/atol (NaN == NaN); os demais valores, por igualdade. Tipos (int x
+    float) não contam, só valores, a menos que 'dtypes_estritos' seja
+    verdadeiro: aí toda coluna com dtype diferente conta como diferente.
+
+    'chaves' ordena as duas tabelas antes da comparação, para saídas cuja
+    ordem de linhas não é definida.
+
+    Retorna: {'celulas', 'celulas_diferentes', 'max_diferenca', 'erro'}
+    """
+    celulas = referencia_df.size
+    if list(referencia_df.columns) != list(candidato.columns):
+        return {"celulas": celulas, "celulas_diferentes": celulas, "max_diferenca": np.nan,
+                "erro": f"colunas {list(candidato.columns)} != {list(referencia_df.columns)}"}
+    if len(referencia_df) != len(candidato):
+        return {"celulas": celulas, "celulas_diferentes": celulas, "max_diferenca": np.nan,
+                "erro": f"{len(candidato)} linhas != {len(referencia_df)}"}
+
+    if chaves:
+        referencia_df = referencia_df.sort_values(chaves, kind="stable")
+        candidato = candidato.sort_values(chaves, kind="stable")
+    referencia_df = referencia_df.reset_index(drop=True)
+    candidato = candidato.reset_index(drop=True)
+
+    diferentes = 0
+    max_diferenca = 0.0
+    tipos_diferentes = []
+    for coluna in referencia_df.columns:
+        a, b = referencia_df[coluna], candidato[coluna]
+        if dtypes_estritos and a.dtype != b.dtype:
+            tipos_diferentes.append(f"{coluna}: {b.dtype} != {a.dtype}")
+            diferentes += len(a)
+            continue
+        if pd.api.types.is_numeric_dtype(a) and pd.api.types.is_numeric_dtype(b):
+            x = a.to_numpy(dtype=float, na_value=np.nan)
+            y = b.to_numpy(dtype=float, na_value=np.nan)
+            iguais = np.isclose(x, y, rtol=rtol, atol=atol, equal_nan=True)
+            com_valor = ~np.isnan(x) & ~np.isnan(y)
+            if com_valor.any():
+                max_diferenca = max(max_diferenca, float(np.abs(x - y)[com_valor].max()))
+        else:
+            x, y = a.astype(object), b.astype(object)
+            iguais = ((x == y) | (x.isna() & y.isna())).to_numpy()
+        diferentes += int((~iguais).sum())
+
+    erro = f"dtypes {'; '.join(tipos_diferentes)}" if tipos_diferentes else ""
+    return {"celulas": celulas, "celulas_diferentes": diferentes,
+            "max_diferenca": max_diferenca, "erro": erro}
+
+
+def _partes(saida) -> dict[str, pd.DataFrame]:
+    # resumo_temporal_por_ano devolve (resumo, outliers)
+    if isinstance(saida, tuple):
+        return {"resumo": saida[0], "outliers": saida[1]}
+    return {"": saida}
+
+
+def _cronometrar(funcao: Callable, repeticoes: int):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        saida = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return saida, min(tempos)
+
+
+def verificar_equivalencia(
+    tamanhos: tuple[int, ...] = (10_000, 100_000, 1_000_000),
+    motores: list[str] | None = None,
+    repeticoes: int = 3,
+    uf_cod: int = 35,
+    semente: int = 42,
+    rtol: float = 1e-9,
+    atol: float = 1e-9,
+    alteracoes: list[str] | None = None,
+    dtypes_estritos: bool = False,
+) -> pd.DataFrame:
+    """
+    Para cada tamanho de base sintética e cada alteração (ALTERACOES),
+    compara a saída de cada motor com a referência em todas as FUNCOES e
+    mede a aceleração (melhor tempo da referência / melhor tempo do motor,
+    em 'repeticoes' execuções). A referência roda sobre uma cópia alterada
+    do quadro; os motores alteram o quadro depois do seu preparo. Só os
+    MOTORES_ALTERAVEIS entram nas alterações.
+
+    Saída: uma linha por tamanho x alteração x motor x função (x parte,
+    para o resumo temporal), com células diferentes, maior diferença
+    numérica, 'equivalente', tempos, aceleração e o tempo de preparo do
+    motor (conversão para Parquet, agregação em blocos, cache inicial...).
+    """
+    motores = list(MOTORES) if motores is None else motores
+    alteracoes = list(ALTERACOES) if alteracoes is None else alteracoes
+    caminho_mapa = "dados/municipios_sp_lista.txt"
+    mapa_mun = (
+        carregar_mapa_municipios_sp_de_txt(caminho_mapa) if os.path.exists(caminho_mapa)
+        else pd.DataFrame(columns=["id_mn_resi_6", "municipio_nome"])
+    )
+
+    linhas = []
+    for tamanho in tamanhos:
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho_zip = gravar_zip_sintetico(
+                gerar_dados_sinteticos(tamanho, semente), os.path.join(diretorio, "DENGSINT.zip"))
+
+            with contextlib.redirect_stdout(open(os.devnull, "w")):
+                quadro = filtrar_classificados(converter_datas(leitor_csv_zip(caminho_zip, COLUNAS)))
+
+            for alteracao in alteracoes:
+                alterar = ALTERACOES[alteracao]
+
+                def contexto(nome, quadro_base=quadro, alterar=None):
+                    pasta = os.path.join(diretorio, alteracao, nome)
+                    os.makedirs(pasta, exist_ok=True)
+                    return Contexto(quadro_base, caminho_zip, mapa_mun, uf_cod, pasta, alterar)
+
+                quadro_ref = quadro if alterar is None else alterar(quadro.copy())
+                ref = motor_referencia(contexto("referencia", quadro_ref))
+                saidas_ref, tempos_ref = {}, {}
+                for funcao in FUNCOES:
+                    saidas_ref[funcao], tempos_ref[funcao] = _cronometrar(ref[funcao], repeticoes)
+
+                for nome in motores:
+                    if alterar is not None and nome not in MOTORES_ALTERAVEIS:
+                        continue
+                    inicio = time.perf_counter()
+                    with contextlib.redirect_stdout(open(os.devnull, "w")):
+                        funcoes = MOTORES[nome](contexto(nome, alterar=alterar))
+                    preparo = time.perf_counter() - inicio
+                    if funcoes is None:
+                        print(f"Motor '{nome}' indisponível neste ambiente; ignorado.")
+                        continue
+
+                    for funcao in FUNCOES:
+                        with contextlib.redirect_stdout(open(os.devnull, "w")):
+                            saida, tempo = _cronometrar(funcoes[funcao], repeticoes)
+
+                        partes_ref, partes = _partes(saidas_ref[funcao]), _partes(saida)
+                        for parte, quadro_parte in partes_ref.items():
+                            chaves = CHAVES_ORDENACAO.get(funcao)
+                            if parte == "outliers":
+                                chaves = ["nu_ano", "semana_ep"]
+                            comparacao = comparar_quadros(
+                                quadro_parte, partes[parte], chaves, rtol, atol, dtypes_estritos)
+                            linhas.append({
+                                "tamanho": tamanho,
+                                "alteracao": alteracao,
+                                "motor": nome,
+                                "funcao": funcao + (f"[{parte}]" if parte else ""),
+                                **comparacao,
+                                "equivalente": comparacao["celulas_diferentes"] == 0,
+                                "tempo_referencia_s": tempos_ref[funcao],
+                                "tempo_s": tempo,
+                                "aceleracao": tempos_ref[funcao] / tempo if tempo > 0 else np.inf,
+                                "preparo_s": preparo,
+                            })
+
+            print(f"Equivalência: base de {tamanho} linhas verificada.")
+
+    return pd.DataFrame(linhas)
+
+
+def resumo_cache(resultado: pd.DataFrame) -> pd.DataFrame:
+    """
+    Acerto do cache contra o recálculo, por tamanho e função, sobre o quadro
+    sem alteração: tempo do motor indice_tabulacao (mesmo código, sem cache)
+    e do motor cache. A linha 'total' soma todas as funções.
+    """
+    base = resultado[resultado["alteracao"] == "nenhuma"]
+    base = base.assign(funcao=base["funcao"].str.split("[", regex=False).str[0])
+    # as partes de uma função dividem a mesma chamada: um tempo por função
+    tempos = (
+        base.drop_duplicates(["tamanho", "motor", "funcao"])
+        .pivot_table(index=["tamanho", "funcao"], columns="motor", values="tempo_s")
+    )
+    if not {"indice_tabulacao", "cache"} <= set(tempos.columns):
+        return pd.DataFrame()
+
+    tempos = tempos[["indice_tabulacao", "cache"]].rename(
+        columns={"indice_tabulacao": "tempo_recalculo_s", "cache": "tempo_acerto_s"})
+    total = tempos.groupby(level="tamanho").sum()
+    total.index = pd.MultiIndex.from_product([total.index, ["total"]], names=tempos.index.names)
+    resumo = pd.concat([tempos, total]).sort_index(level="tamanho", sort_remaining=False).reset_index()
+    resumo["aceleracao"] = resumo["tempo_recalculo_s"] / resumo["tempo_acerto_s"]
+    return resumo
+
+
+if __name__ == "__main__":
+    # uso: python equivalencia_motores.py [tamanhos...] [--dtypes-estritos]
+    argumentos = [a for a in sys.argv[1:] if a != "--dtypes-estritos"]
+    tamanhos = tuple(int(t) for t in argumentos) or (10_000, 100_000, 1_000_000)
+
+    resultado = verificar_equivalencia(tamanhos, dtypes_estritos="--dtypes-estritos" in sys.argv)
+
+    pd.set_option("display.width", 200)
+    print(resultado[[
+        "tamanho", "alteracao", "motor", "funcao", "celulas_diferentes", "max_diferenca",
+        "equivalente", "tempo_s", "aceleracao", "preparo_s",
+    ]].to_string(index=False))
+
+    acertos = resumo_cache(resultado)
+    if not acertos.empty:
+        print("\nCache: acerto contra recálculo (sem alteração):")
+        print(acertos.to_string(index=False))
+
+    divergentes = resultado[~resultado["equivalente"]]
+    if not divergentes.empty:
+        print("\nSaídas divergentes da referência:")
+        print(divergentes[["tamanho", "alteracao", "motor", "funcao", "erro"]].to_string(index=False))
+        sys.exit(1)